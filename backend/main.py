@@ -4,34 +4,52 @@ FastAPI main application for dynamic multi-agent system.
 
 from fastapi import FastAPI, HTTPException, Depends, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import Session
-from typing import List, Dict, Any, Optional
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.orm import Session, load_only, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import TypeAdapter
+from typing import List, Dict, Any, Optional, Set
 import uuid
 import json
+import orjson
 import asyncio
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
 import re
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from database import get_db, engine
-from models import Base, Agent, Task, Execution, TaskStatus, AgentStatus
+from database import get_db, get_async_db, engine, AsyncSessionLocal, init_db, warm_async_pool
+from models import Agent, Task, Execution, TaskStatus, AgentStatus
 from schemas import (
-    AgentCreate, AgentUpdate, AgentResponse,
-    TaskCreate, TaskUpdate, TaskResponse,
+    AgentCreate, AgentUpdate, AgentResponse, AgentListItem,
+    TaskCreate, TaskUpdate, TaskResponse, TaskListItem,
     ExecutionResponse, SystemStatus, TaskExecutionRequest, TaskExecutionResponse,
     AgentStatusSummary
 )
-from services.execution_engine import ExecutionEngine
+from services import broadcast_channel
+from services.execution_engine import ExecutionEngine, claude_pool
 from services.advanced_orchestrator import (
     advanced_orchestrator, WorkflowType, AgentCommunication
 )
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
-# Configure logging
+# Create database tables and any indexes they are missing
+init_db()
+
+# Configure logging. Handlers only enqueue records; a listener thread writes them,
+# so a slow stdout never blocks the event loop
+_log_queue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
+)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
 # Cleanup orphaned executions on startup
@@ -63,13 +81,78 @@ def parse_estimated_duration(duration_str: Optional[str]) -> Optional[int]:
         return int(match.group(1))
     return None
 
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson; non-string keys become strings, as with the stdlib encoder."""
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+# Serializes whatever model (or list of models) it is given, by its runtime type
+_MODEL_ADAPTER = TypeAdapter(Any)
+
+
+def model_response(content: Any) -> Response:
+    """Render response models the services already built.
+    
+    Returned bare, FastAPI would dump them and validate the result against response_model again.
+    """
+    return Response(_MODEL_ADAPTER.dump_json(content), media_type="application/json")
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="MCP Multi-Agent System API",
     description="Dynamic multi-agent system with user-configurable agents and asynchronous execution",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=ORJSONResponse
 )
 
+
+@app.on_event("startup")
+async def warm_database_pool():
+    """Connect the async pool up front so the first burst of requests doesn't queue on connects."""
+    try:
+        await warm_async_pool()
+    except Exception as e:
+        logger.warning("Database pool warm-up failed: %s", e)
+
+
+@app.on_event("startup")
+async def start_broadcast_sender():
+    websocket_manager.start()
+
+
+@app.on_event("shutdown")
+async def stop_broadcast_sender():
+    await websocket_manager.stop()
+
+
+@app.on_event("shutdown")
+async def stop_claude_pool():
+    """Kill the idle Claude CLI processes kept warm for upcoming runs."""
+    await claude_pool.close()
+
+
+@app.on_event("startup")
+async def start_execution_control_listener():
+    await execution_engine.start_control_listener()
+
+
+@app.on_event("shutdown")
+async def stop_execution_control_listener():
+    await execution_engine.stop_control_listener()
+
+
+@app.on_event("startup")
+async def start_state_change_listener():
+    execution_engine.start_state_change_listener()
+
+
+@app.on_event("shutdown")
+async def stop_state_change_listener():
+    await execution_engine.stop_state_change_listener()
+
 # Dynamic CORS configuration for WSL and local development
 import subprocess
 import socket
@@ -125,10 +208,8 @@ async def root():
 class AgentManager:
     """Manages agent lifecycle and operations."""
     
-    async def create_agent(self, db: Session, agent_data: AgentCreate) -> Agent:
+    async def create_agent(self, db: AsyncSession, agent_data: AgentCreate) -> Agent:
         """Create a new agent."""
-        from models import AgentStatus
-        
         db_agent = Agent(
             id=str(uuid.uuid4()),
             name=agent_data.name,
@@ -147,21 +228,30 @@ class AgentManager:
         )
         
         db.add(db_agent)
-        db.commit()
-        db.refresh(db_agent)
+        await db.commit()
         return db_agent
     
-    async def list_agents(self, db: Session, skip: int = 0, limit: int = 100) -> List[Agent]:
+    async def list_agents(self, db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Agent]:
         """List all agents."""
-        return db.query(Agent).offset(skip).limit(limit).all()
+        return (await db.scalars(select(Agent).offset(skip).limit(limit))).all()
     
-    async def get_agent(self, db: Session, agent_id: str) -> Agent:
+    async def list_agent_items(self, db: AsyncSession, skip: int = 0, limit: int = 100) -> List[AgentListItem]:
+        """List agents, loading only the columns listings show."""
+        agents = (await db.scalars(
+            select(Agent)
+            .options(load_only(Agent.id, Agent.name, Agent.role, Agent.status, Agent.updated_at))
+            .offset(skip)
+            .limit(limit)
+        )).all()
+        return [AgentListItem.model_validate(agent) for agent in agents]
+    
+    async def get_agent(self, db: AsyncSession, agent_id: str) -> Agent:
         """Get agent by ID."""
-        return db.query(Agent).filter(Agent.id == agent_id).first()
+        return await db.get(Agent, agent_id)
     
-    async def update_agent(self, db: Session, agent_id: str, agent_update: AgentUpdate) -> Agent:
+    async def update_agent(self, db: AsyncSession, agent_id: str, agent_update: AgentUpdate) -> Agent:
         """Update agent."""
-        db_agent = db.query(Agent).filter(Agent.id == agent_id).first()
+        db_agent = await db.get(Agent, agent_id)
         if not db_agent:
             raise ValueError("Agent not found")
         
@@ -170,13 +260,12 @@ class AgentManager:
             setattr(db_agent, field, value)
         
         db_agent.updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(db_agent)
+        await db.commit()
         return db_agent
     
     async def delete_agent(self, db: Session, agent_id: str):
         """Delete agent with proper relationship cleanup."""
-        db_agent = db.query(Agent).filter(Agent.id == agent_id).first()
+        db_agent = db.get(Agent, agent_id)
         if not db_agent:
             raise ValueError("Agent not found")
         
@@ -184,6 +273,16 @@ class AgentManager:
         from models import TaskAgentAssignment
         db.query(TaskAgentAssignment).filter(TaskAgentAssignment.agent_id == agent_id).delete()
         
+        # Remove the agent from executions it took part in, and the participants of its own executions
+        from models import ExecutionAgent, ExecutionLog
+        agent_execution_ids = db.query(Execution.id).filter(Execution.agent_id == agent_id)
+        db.query(ExecutionAgent).filter(
+            (ExecutionAgent.agent_id == agent_id) | ExecutionAgent.execution_id.in_(agent_execution_ids)
+        ).delete(synchronize_session=False)
+        db.query(ExecutionLog).filter(
+            ExecutionLog.execution_id.in_(agent_execution_ids)
+        ).delete(synchronize_session=False)
+        
         # Delete all executions for this agent
         db.query(Execution).filter(Execution.agent_id == agent_id).delete()
         
@@ -191,46 +290,88 @@ class AgentManager:
         db.delete(db_agent)
         db.commit()
     
-    async def get_agent_status_summaries(self, db: Session) -> List[AgentStatusSummary]:
-        """Get summary of all agent statuses."""
-        agents = db.query(Agent).all()
-        summaries = []
-        
-        for agent in agents:
-            # Get current task if any
-            current_execution = db.query(Execution).filter(
-                Execution.agent_id == agent.id,
-                Execution.status.in_(["running", "starting"])
-            ).first()
-            
-            # Count completed tasks today
-            today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-            tasks_today = db.query(Execution).filter(
-                Execution.agent_id == agent.id,
-                Execution.status == "completed",
-                Execution.end_time >= today_start
-            ).count()
-            
-            summaries.append(AgentStatusSummary(
-                agent_id=agent.id,
-                name=agent.name,
-                status=agent.status,
-                current_task_id=current_execution.task_id if current_execution else None,
-                current_task_title=None,  # Would need to join with Task table
+    async def get_agent_status_summaries(self, db: AsyncSession) -> List[AgentStatusSummary]:
+        """Get summary of all agent statuses in one query."""
+        today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        
+        # Per agent: the task of an active execution, if any, and today's completed executions
+        current = (
+            select(Execution.agent_id, func.min(Execution.task_id).label("task_id"))
+            .where(Execution.status.in_(["running", "starting"]))
+            .group_by(Execution.agent_id)
+            .subquery()
+        )
+        completed_today = (
+            select(Execution.agent_id, func.count().label("completed"))
+            .where(Execution.status == "completed", Execution.end_time >= today_start)
+            .group_by(Execution.agent_id)
+            .subquery()
+        )
+        rows = (await db.execute(
+            select(
+                Agent.id, Agent.name, Agent.status, Agent.last_active,
+                current.c.task_id, Task.title, func.coalesce(completed_today.c.completed, 0)
+            )
+            .outerjoin(current, current.c.agent_id == Agent.id)
+            .outerjoin(Task, Task.id == current.c.task_id)
+            .outerjoin(completed_today, completed_today.c.agent_id == Agent.id)
+        )).all()
+        
+        return [
+            AgentStatusSummary(
+                agent_id=agent_id,
+                name=name,
+                status=status,
+                current_task_id=task_id,
+                current_task_title=task_title,
                 tasks_completed_today=tasks_today,
                 average_task_duration=None,  # Would need calculation
-                last_active=agent.last_active
-            ))
-        
-        return summaries
+                last_active=last_active
+            )
+            for agent_id, name, status, last_active, task_id, task_title, tasks_today in rows
+        ]
 
 
 class TaskScheduler:
     """Manages task scheduling and lifecycle."""
     
-    async def create_task(self, db: Session, task_data: TaskCreate) -> TaskResponse:
+    @staticmethod
+    def _task_response(task: Task) -> TaskResponse:
+        """Serialize a task whose assigned agents are loaded; estimated_duration becomes minutes."""
+        return TaskResponse(
+            id=task.id,
+            title=task.title,
+            description=task.description,
+            expected_output=task.expected_output,
+            resources=task.resources or [],
+            dependencies=task.dependencies or [],
+            priority=task.priority,
+            deadline=task.deadline,
+            estimated_duration=parse_estimated_duration(task.estimated_duration),
+            status=task.status,
+            results=task.results or {},
+            error_message=task.error_message,
+            created_at=task.created_at,
+            updated_at=task.updated_at,
+            started_at=task.started_at,
+            completed_at=task.completed_at,
+            assigned_agent_ids=[agent.id for agent in task.assigned_agents],
+            assigned_agents=[AgentResponse.from_orm(agent) for agent in task.assigned_agents]
+        )
+    
+    async def _load_task(self, db: AsyncSession, task_id: str) -> Optional[Task]:
+        """Load a task with its assigned agents; lazy loads aren't available on an AsyncSession."""
+        return await db.scalar(
+            select(Task).where(Task.id == task_id).options(selectinload(Task.assigned_agents))
+        )
+    
+    async def create_task(self, db: AsyncSession, task_data: TaskCreate) -> TaskResponse:
         """Create a new task and return properly serialized response."""
+        agents = []
+        if task_data.assigned_agent_ids:
+            agents = (await db.scalars(select(Agent).where(Agent.id.in_(task_data.assigned_agent_ids)))).all()
         
+        # Task and agent assignments go out in a single commit
         db_task = Task(
             id=str(uuid.uuid4()),
             title=task_data.title,
@@ -244,113 +385,47 @@ class TaskScheduler:
             status=TaskStatus.PENDING,
             results={},
             created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
+            updated_at=datetime.utcnow(),
+            assigned_agents=list(agents)
         )
         
         db.add(db_task)
-        db.commit()
-        db.refresh(db_task)
+        await db.commit()
         
-        # Assign agents to task
-        if task_data.assigned_agent_ids:
-            agents = db.query(Agent).filter(Agent.id.in_(task_data.assigned_agent_ids)).all()
-            db_task.assigned_agents = agents
-            db.commit()
-            db.refresh(db_task)
-        
-        # Convert to TaskResponse with proper estimated_duration handling
-        estimated_duration = parse_estimated_duration(db_task.estimated_duration)
-        
-        return TaskResponse(
-            id=db_task.id,
-            title=db_task.title,
-            description=db_task.description,
-            expected_output=db_task.expected_output,
-            resources=db_task.resources or [],
-            dependencies=db_task.dependencies or [],
-            priority=db_task.priority,
-            deadline=db_task.deadline,
-            estimated_duration=estimated_duration,
-            status=db_task.status,
-            results=db_task.results or {},
-            error_message=db_task.error_message,
-            created_at=db_task.created_at,
-            updated_at=db_task.updated_at,
-            started_at=db_task.started_at,
-            completed_at=db_task.completed_at,
-            assigned_agent_ids=[agent.id for agent in db_task.assigned_agents],
-            assigned_agents=[AgentResponse.from_orm(agent) for agent in db_task.assigned_agents]
-        )
+        return self._task_response(db_task)
     
-    async def list_tasks(self, db: Session, skip: int = 0, limit: int = 100) -> List[TaskResponse]:
-        """List all tasks with proper serialization."""
-        tasks = db.query(Task).offset(skip).limit(limit).all()
-        
-        # Convert to TaskResponse objects with proper estimated_duration handling
-        task_responses = []
-        for task in tasks:
-            # Convert estimated_duration from string to int
-            estimated_duration = parse_estimated_duration(task.estimated_duration)
-            
-            # Create TaskResponse with converted duration
-            task_response = TaskResponse(
-                id=task.id,
-                title=task.title,
-                description=task.description,
-                expected_output=task.expected_output,
-                resources=task.resources or [],
-                dependencies=task.dependencies or [],
-                priority=task.priority,
-                deadline=task.deadline,
-                estimated_duration=estimated_duration,
-                status=task.status,
-                results=task.results or {},
-                error_message=task.error_message,
-                created_at=task.created_at,
-                updated_at=task.updated_at,
-                started_at=task.started_at,
-                completed_at=task.completed_at,
-                assigned_agent_ids=[agent.id for agent in task.assigned_agents],
-                assigned_agents=[AgentResponse.from_orm(agent) for agent in task.assigned_agents]
-            )
-            task_responses.append(task_response)
-        
-        return task_responses
+    async def list_tasks(
+        self, db: AsyncSession, skip: int = 0, limit: int = 100, status: Optional[TaskStatus] = None
+    ) -> List[TaskResponse]:
+        """List all tasks, optionally only those with the given status, with proper serialization."""
+        query = select(Task).options(selectinload(Task.assigned_agents))
+        if status is not None:
+            query = query.where(Task.status == status)
+        tasks = (await db.scalars(query.offset(skip).limit(limit))).all()
+        return [self._task_response(task) for task in tasks]
     
-    async def get_task(self, db: Session, task_id: str) -> Optional[TaskResponse]:
+    async def list_task_items(
+        self, db: AsyncSession, skip: int = 0, limit: int = 100, status: Optional[TaskStatus] = None
+    ) -> List[TaskListItem]:
+        """List tasks, optionally only those with the given status, loading only the columns listings show."""
+        query = select(Task).options(
+            load_only(Task.id, Task.title, Task.status, Task.priority, Task.deadline, Task.updated_at)
+        )
+        if status is not None:
+            query = query.where(Task.status == status)
+        tasks = (await db.scalars(query.offset(skip).limit(limit))).all()
+        return [TaskListItem.model_validate(task) for task in tasks]
+    
+    async def get_task(self, db: AsyncSession, task_id: str) -> Optional[TaskResponse]:
         """Get task by ID with proper serialization."""
-        task = db.query(Task).filter(Task.id == task_id).first()
+        task = await self._load_task(db, task_id)
         if not task:
             return None
-            
-        # Convert estimated_duration from string to int
-        estimated_duration = parse_estimated_duration(task.estimated_duration)
-        
-        # Create TaskResponse with converted duration
-        return TaskResponse(
-            id=task.id,
-            title=task.title,
-            description=task.description,
-            expected_output=task.expected_output,
-            resources=task.resources or [],
-            dependencies=task.dependencies or [],
-            priority=task.priority,
-            deadline=task.deadline,
-            estimated_duration=estimated_duration,
-            status=task.status,
-            results=task.results or {},
-            error_message=task.error_message,
-            created_at=task.created_at,
-            updated_at=task.updated_at,
-            started_at=task.started_at,
-            completed_at=task.completed_at,
-            assigned_agent_ids=[agent.id for agent in task.assigned_agents],
-            assigned_agents=[AgentResponse.from_orm(agent) for agent in task.assigned_agents]
-        )
+        return self._task_response(task)
     
-    async def update_task(self, db: Session, task_id: str, task_update: TaskUpdate) -> TaskResponse:
+    async def update_task(self, db: AsyncSession, task_id: str, task_update: TaskUpdate) -> TaskResponse:
         """Update task and return properly serialized response."""
-        db_task = db.query(Task).filter(Task.id == task_id).first()
+        db_task = await self._load_task(db, task_id)
         if not db_task:
             raise ValueError("Task not found")
         
@@ -376,58 +451,98 @@ class TaskScheduler:
             
             # Add new assignments
             if assigned_agent_ids:
-                agents = db.query(Agent).filter(Agent.id.in_(assigned_agent_ids)).all()
+                agents = (await db.scalars(select(Agent).where(Agent.id.in_(assigned_agent_ids)))).all()
                 db_task.assigned_agents.extend(agents)
         
         db_task.updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(db_task)
-        
-        # Convert to TaskResponse with proper estimated_duration handling
-        estimated_duration = parse_estimated_duration(db_task.estimated_duration)
+        await db.commit()
         
-        return TaskResponse(
-            id=db_task.id,
-            title=db_task.title,
-            description=db_task.description,
-            expected_output=db_task.expected_output,
-            resources=db_task.resources or [],
-            dependencies=db_task.dependencies or [],
-            priority=db_task.priority,
-            deadline=db_task.deadline,
-            estimated_duration=estimated_duration,
-            status=db_task.status,
-            results=db_task.results or {},
-            error_message=db_task.error_message,
-            created_at=db_task.created_at,
-            updated_at=db_task.updated_at,
-            started_at=db_task.started_at,
-            completed_at=db_task.completed_at,
-            assigned_agent_ids=[agent.id for agent in db_task.assigned_agents],
-            assigned_agents=[AgentResponse.from_orm(agent) for agent in db_task.assigned_agents]
-        )
+        return self._task_response(db_task)
     
-    async def delete_task(self, db: Session, task_id: str):
+    async def delete_task(self, db: AsyncSession, task_id: str):
         """Delete task."""
-        db_task = db.query(Task).filter(Task.id == task_id).first()
+        # Both collections are loaded so the ORM can clear assignments and unlink executions
+        db_task = await db.scalar(
+            select(Task)
+            .where(Task.id == task_id)
+            .options(selectinload(Task.assigned_agents), selectinload(Task.executions))
+        )
         if not db_task:
             raise ValueError("Task not found")
         
-        db.delete(db_task)
-        db.commit()
+        await db.delete(db_task)
+        await db.commit()
+
+
+# Seconds a single client may take to accept a broadcast before it is dropped
+BROADCAST_SEND_TIMEOUT = 1.0
+# Broadcasts waiting to be sent; once full, the oldest is dropped to make room
+BROADCAST_QUEUE_SIZE = 10_000
 
 
 class WebSocketManager:
     """Manages WebSocket connections and real-time updates."""
     
     def __init__(self):
-        self.connections: List[WebSocket] = []
+        self.connections: Set[WebSocket] = set()
         self.connection_info: Dict[WebSocket, Dict[str, Any]] = {}
+        self.queue: Optional[asyncio.Queue] = None
+        self._sender: Optional[asyncio.Task] = None
+        self._relay: Optional[asyncio.Task] = None
+        
+        # With BROADCAST_REDIS_URL set, broadcasts go through Redis so that every API
+        # worker, and every Celery worker's executions, reach all connections
+        self._redis = broadcast_channel.redis_client()
+    
+    def start(self):
+        """Start the background tasks that send queued broadcasts and relay them from Redis."""
+        if self._sender is None:
+            self.queue = asyncio.Queue(maxsize=BROADCAST_QUEUE_SIZE)
+            self._sender = asyncio.create_task(self._send_queued())
+        if self._redis is not None and self._relay is None:
+            self._relay = asyncio.create_task(self._relay_broadcasts())
+    
+    async def stop(self):
+        """Stop the background tasks; anything still queued is discarded."""
+        for task in (self._relay, self._sender):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._relay = None
+        self._sender = None
+        self.queue = None
+    
+    async def _relay_broadcasts(self):
+        """Queue broadcasts published by any worker for this worker's clients."""
+        while True:
+            try:
+                async with self._redis.pubsub() as pubsub:
+                    await pubsub.subscribe(broadcast_channel.BROADCAST_CHANNEL)
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        self._enqueue(*broadcast_channel.unpack(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Broadcast relay lost its Redis subscription, retrying: %s", e)
+                await asyncio.sleep(1)
+    
+    async def _send_queued(self):
+        while True:
+            data, subscription_filter = await self.queue.get()
+            try:
+                await self._fanout(data, subscription_filter)
+            except Exception:
+                logger.exception("WebSocket broadcast failed")
     
     async def connect(self, websocket: WebSocket):
         """Accept new WebSocket connection."""
         await websocket.accept()
-        self.connections.append(websocket)
+        self.connections.add(websocket)
         self.connection_info[websocket] = {
             "connected_at": datetime.utcnow(),
             "subscriptions": ["all"]  # Default subscription to all events
@@ -442,10 +557,8 @@ class WebSocketManager:
     
     def disconnect(self, websocket: WebSocket):
         """Handle WebSocket disconnection."""
-        if websocket in self.connections:
-            self.connections.remove(websocket)
-        if websocket in self.connection_info:
-            del self.connection_info[websocket]
+        self.connections.discard(websocket)
+        self.connection_info.pop(websocket, None)
     
     async def send_to_connection(self, websocket: WebSocket, message: Dict[str, Any]):
         """Send message to specific WebSocket connection."""
@@ -455,32 +568,60 @@ class WebSocketManager:
             # Connection is broken, remove it
             self.disconnect(websocket)
     
-    async def broadcast(self, message: Dict[str, Any], subscription_filter: str = None):
-        """Broadcast message to all connected clients."""
+    async def broadcast(self, message: Dict[str, Any], subscription_filter: str = None, local: bool = False):
+        """Broadcast message to all connected clients; local=True skips the other workers' clients."""
+        if not self.connections and (self._redis is None or local):
+            return
+        
+        await self.broadcast_bytes(broadcast_channel.encode_broadcast(message), subscription_filter, local)
+    
+    async def broadcast_bytes(self, data: bytes, subscription_filter: str = None, local: bool = False):
+        """Broadcast a pre-serialized JSON message to all connected clients."""
+        if self._redis is not None and not local:
+            # Other workers hold the rest of the connections; the relay delivers to ours
+            await self._redis.publish(
+                broadcast_channel.BROADCAST_CHANNEL, broadcast_channel.pack(data, subscription_filter)
+            )
+            return
+        
         if not self.connections:
             return
         
-        # Add metadata
-        message["broadcast_id"] = str(uuid.uuid4())
-        message["server_timestamp"] = datetime.utcnow().isoformat()
+        if self.queue is None:
+            # Sender not running (e.g. outside the app), so deliver inline
+            await self._fanout(data, subscription_filter)
+            return
+        
+        self._enqueue(data, subscription_filter)
+    
+    def _enqueue(self, data: bytes, subscription_filter: Optional[str]):
+        # Hand off to the sender task so callers never wait on slow clients
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait((data, subscription_filter))
+    
+    async def _fanout(self, data: bytes, subscription_filter: str = None):
+        text = data.decode()
         
         # Send to all connections (or filtered by subscription)
-        disconnected = []
-        for websocket in self.connections[:]:
-            try:
-                # Check subscription filter if provided
-                if subscription_filter:
-                    subscriptions = self.connection_info.get(websocket, {}).get("subscriptions", [])
-                    if subscription_filter not in subscriptions and "all" not in subscriptions:
-                        continue
-                
-                await websocket.send_json(message)
-            except Exception:
-                disconnected.append(websocket)
+        recipients = []
+        for websocket in list(self.connections):
+            if subscription_filter:
+                subscriptions = self.connection_info.get(websocket, {}).get("subscriptions", [])
+                if subscription_filter not in subscriptions and "all" not in subscriptions:
+                    continue
+            recipients.append(websocket)
+        
+        # Sends run concurrently, so one slow client delays nobody else
+        results = await asyncio.gather(
+            *(asyncio.wait_for(websocket.send_text(text), BROADCAST_SEND_TIMEOUT) for websocket in recipients),
+            return_exceptions=True
+        )
         
-        # Clean up disconnected connections
-        for websocket in disconnected:
-            self.disconnect(websocket)
+        # Clean up connections that failed or timed out
+        for websocket, result in zip(recipients, results):
+            if isinstance(result, Exception):
+                self.disconnect(websocket)
     
     async def broadcast_system_event(self, event_type: str, data: Dict[str, Any]):
         """Broadcast system-level events."""
@@ -565,33 +706,11 @@ async def websocket_endpoint(websocket: WebSocket):
 
 # Agent Endpoints
 @app.post("/api/agents", response_model=AgentResponse)
-async def create_agent(agent: AgentCreate, db: Session = Depends(get_db)):
+async def create_agent(agent: AgentCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new agent with custom configuration."""
     try:
-        from models import AgentStatus
-        import uuid
-        
-        # Create new agent
-        db_agent = Agent(
-            id=str(uuid.uuid4()),
-            name=agent.name,
-            role=agent.role,
-            description=agent.description,
-            system_prompt=agent.system_prompt,
-            capabilities=agent.capabilities,
-            tools=agent.tools,
-            objectives=agent.objectives,
-            constraints=agent.constraints,
-            memory_settings=agent.memory_settings,
-            execution_settings=agent.execution_settings,
-            status=AgentStatus.IDLE,
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
-        )
-        
-        db.add(db_agent)
-        db.commit()
-        db.refresh(db_agent)
+        db_agent = await agent_manager.create_agent(db, agent)
+        execution_engine.invalidate_system_status()
         
         # Broadcast agent creation
         await websocket_manager.broadcast_agent_event("created", {
@@ -607,14 +726,21 @@ async def create_agent(agent: AgentCreate, db: Session = Depends(get_db)):
 
 
 @app.get("/api/agents", response_model=List[AgentResponse])
-async def list_agents(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def list_agents(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db)):
     """List all agents."""
     agents = await agent_manager.list_agents(db, skip=skip, limit=limit)
     return agents
 
 
+# Declared before /api/agents/{agent_id} so "summary" isn't taken for an agent id
+@app.get("/api/agents/summary", response_model=List[AgentListItem])
+async def list_agent_summaries(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db)):
+    """List agents with only the fields listings show."""
+    return model_response(await agent_manager.list_agent_items(db, skip=skip, limit=limit))
+
+
 @app.get("/api/agents/{agent_id}", response_model=AgentResponse)
-async def get_agent(agent_id: str, db: Session = Depends(get_db)):
+async def get_agent(agent_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get specific agent by ID."""
     agent = await agent_manager.get_agent(db, agent_id)
     if not agent:
@@ -623,10 +749,11 @@ async def get_agent(agent_id: str, db: Session = Depends(get_db)):
 
 
 @app.put("/api/agents/{agent_id}", response_model=AgentResponse)
-async def update_agent(agent_id: str, agent_update: AgentUpdate, db: Session = Depends(get_db)):
+async def update_agent(agent_id: str, agent_update: AgentUpdate, db: AsyncSession = Depends(get_async_db)):
     """Update agent configuration."""
     try:
         db_agent = await agent_manager.update_agent(db, agent_id, agent_update)
+        execution_engine.invalidate_system_status()
         
         # Broadcast agent update
         await websocket_manager.broadcast_agent_event("updated", {
@@ -646,7 +773,7 @@ async def delete_agent(agent_id: str, force: bool = False, db: Session = Depends
     """Delete an agent with proper task handling."""
     try:
         # Check if agent exists
-        agent = db.query(Agent).filter(Agent.id == agent_id).first()
+        agent = db.get(Agent, agent_id)
         if not agent:
             raise HTTPException(status_code=404, detail="Agent not found")
         
@@ -665,11 +792,12 @@ async def delete_agent(agent_id: str, force: bool = False, db: Session = Depends
         
         # Cancel all running executions if force=True
         if running_executions and force:
-            for execution in running_executions:
-                try:
-                    await execution_engine.abort_execution(db, execution.id)
-                except Exception as e:
-                    print(f"Failed to abort execution {execution.id}: {e}")
+            async with AsyncSessionLocal() as async_db:
+                for execution in running_executions:
+                    try:
+                        await execution_engine.abort_execution(execution.id, async_db)
+                    except Exception as e:
+                        print(f"Failed to abort execution {execution.id}: {e}")
         
         # Get associated tasks
         associated_tasks = db.query(Task).join(Task.assigned_agents).filter(Agent.id == agent_id).all()
@@ -693,6 +821,7 @@ async def delete_agent(agent_id: str, force: bool = False, db: Session = Depends
         
         # Delete the agent
         await agent_manager.delete_agent(db, agent_id)
+        execution_engine.invalidate_system_status()
         
         # Broadcast agent deletion with task info
         await websocket_manager.broadcast_agent_event("deleted", {
@@ -714,10 +843,11 @@ async def delete_agent(agent_id: str, force: bool = False, db: Session = Depends
 
 # Task Endpoints
 @app.post("/api/tasks", response_model=TaskResponse)
-async def create_task(task: TaskCreate, db: Session = Depends(get_db)):
+async def create_task(task: TaskCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new task."""
     try:
         db_task = await task_scheduler.create_task(db, task)
+        execution_engine.invalidate_system_status()
         
         # Broadcast task creation
         await websocket_manager.broadcast_task_event("created", {
@@ -727,32 +857,44 @@ async def create_task(task: TaskCreate, db: Session = Depends(get_db)):
             "priority": db_task.priority.value
         })
         
-        return db_task
+        return model_response(db_task)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.get("/api/tasks", response_model=List[TaskResponse])
-async def list_tasks(skip: int = 0, limit: int = 100, status: str = None, db: Session = Depends(get_db)):
+async def list_tasks(
+    skip: int = 0, limit: int = 100, status: Optional[TaskStatus] = None, db: AsyncSession = Depends(get_async_db)
+):
     """List all tasks with optional status filter."""
-    tasks = await task_scheduler.list_tasks(db, skip=skip, limit=limit)
-    return tasks
+    tasks = await task_scheduler.list_tasks(db, skip=skip, limit=limit, status=status)
+    return model_response(tasks)
+
+
+# Declared before /api/tasks/{task_id} so "summary" isn't taken for a task id
+@app.get("/api/tasks/summary", response_model=List[TaskListItem])
+async def list_task_summaries(
+    skip: int = 0, limit: int = 100, status: Optional[TaskStatus] = None, db: AsyncSession = Depends(get_async_db)
+):
+    """List tasks with only the fields listings show, with optional status filter."""
+    return model_response(await task_scheduler.list_task_items(db, skip=skip, limit=limit, status=status))
 
 
 @app.get("/api/tasks/{task_id}", response_model=TaskResponse)
-async def get_task(task_id: str, db: Session = Depends(get_db)):
+async def get_task(task_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get specific task by ID."""
     task = await task_scheduler.get_task(db, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    return task
+    return model_response(task)
 
 
 @app.put("/api/tasks/{task_id}", response_model=TaskResponse)
-async def update_task(task_id: str, task_update: TaskUpdate, db: Session = Depends(get_db)):
+async def update_task(task_id: str, task_update: TaskUpdate, db: AsyncSession = Depends(get_async_db)):
     """Update task configuration."""
     try:
         db_task = await task_scheduler.update_task(db, task_id, task_update)
+        execution_engine.invalidate_system_status()
         
         # Broadcast task update
         await websocket_manager.broadcast({
@@ -761,16 +903,17 @@ async def update_task(task_id: str, task_update: TaskUpdate, db: Session = Depen
             "timestamp": datetime.utcnow().isoformat()
         })
         
-        return db_task
+        return model_response(db_task)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.delete("/api/tasks/{task_id}")
-async def delete_task(task_id: str, db: Session = Depends(get_db)):
+async def delete_task(task_id: str, db: AsyncSession = Depends(get_async_db)):
     """Delete a task."""
     try:
         await task_scheduler.delete_task(db, task_id)
+        execution_engine.invalidate_system_status()
         
         # Broadcast task deletion
         await websocket_manager.broadcast({
@@ -785,7 +928,7 @@ async def delete_task(task_id: str, db: Session = Depends(get_db)):
 
 
 @app.post("/api/tasks/execute", response_model=TaskExecutionResponse)
-async def execute_task_endpoint(request: TaskExecutionRequest, db: Session = Depends(get_db)):
+async def execute_task_endpoint(request: TaskExecutionRequest, db: AsyncSession = Depends(get_async_db)):
     """Execute a task with specified agents."""
     try:
         execution = await execution_engine.start_task_execution(db, request)
@@ -804,7 +947,7 @@ async def execute_task_endpoint(request: TaskExecutionRequest, db: Session = Dep
 
 # Execution Endpoints
 @app.post("/api/execution/start", response_model=TaskExecutionResponse)
-async def start_task_execution(request: TaskExecutionRequest, db: Session = Depends(get_db)):
+async def start_task_execution(request: TaskExecutionRequest, db: AsyncSession = Depends(get_async_db)):
     """Start executing a task with specified agents."""
     try:
         execution = await execution_engine.start_task_execution(db, request)
@@ -822,7 +965,7 @@ async def start_task_execution(request: TaskExecutionRequest, db: Session = Depe
 
 
 @app.post("/api/execution/stop/{execution_id}")
-async def stop_execution(execution_id: str, db: Session = Depends(get_db)):
+async def stop_execution(execution_id: str, db: AsyncSession = Depends(get_async_db)):
     """Stop a running execution."""
     try:
         await execution_engine.abort_execution(execution_id, db)
@@ -840,23 +983,25 @@ async def stop_execution(execution_id: str, db: Session = Depends(get_db)):
 
 
 @app.get("/api/execution/status", response_model=List[ExecutionResponse])
-async def get_execution_status(db: Session = Depends(get_db)):
-    """Get status of all current executions."""
-    executions = execution_engine.get_all_executions(db)
-    return executions
+async def get_execution_status(
+    skip: int = 0, limit: int = 100, include_logs: bool = True, db: AsyncSession = Depends(get_async_db)
+):
+    """Get status of current executions, newest first; include_logs=false leaves logs out."""
+    executions = await execution_engine.get_all_executions(db, skip=skip, limit=limit, include_logs=include_logs)
+    return model_response(executions)
 
 
 @app.get("/api/execution/{execution_id}", response_model=ExecutionResponse)
-async def get_execution_details(execution_id: str, db: Session = Depends(get_db)):
+async def get_execution_details(execution_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get detailed information about a specific execution."""
-    execution = execution_engine.get_execution_status(execution_id, db)
+    execution = await execution_engine.get_execution_status(execution_id, db)
     if not execution:
         raise HTTPException(status_code=404, detail="Execution not found")
-    return execution
+    return model_response(execution)
 
 
 @app.post("/api/execution/{execution_id}/cancel")
-async def cancel_execution(execution_id: str, db: Session = Depends(get_db)):
+async def cancel_execution(execution_id: str, db: AsyncSession = Depends(get_async_db)):
     """Cancel a running execution."""
     try:
         result = await execution_engine.abort_execution(execution_id, db)
@@ -866,7 +1011,7 @@ async def cancel_execution(execution_id: str, db: Session = Depends(get_db)):
 
 
 @app.post("/api/execution/{execution_id}/pause")
-async def pause_execution(execution_id: str, db: Session = Depends(get_db)):
+async def pause_execution(execution_id: str, db: AsyncSession = Depends(get_async_db)):
     """Pause a running execution."""
     try:
         result = await execution_engine.pause_execution(execution_id, db)
@@ -876,7 +1021,7 @@ async def pause_execution(execution_id: str, db: Session = Depends(get_db)):
 
 
 @app.post("/api/execution/{execution_id}/resume")
-async def resume_execution(execution_id: str, db: Session = Depends(get_db)):
+async def resume_execution(execution_id: str, db: AsyncSession = Depends(get_async_db)):
     """Resume a paused execution."""
     try:
         result = await execution_engine.resume_execution(execution_id, db)
@@ -886,7 +1031,7 @@ async def resume_execution(execution_id: str, db: Session = Depends(get_db)):
 
 
 @app.post("/api/execution/{execution_id}/abort")
-async def abort_execution(execution_id: str, db: Session = Depends(get_db)):
+async def abort_execution(execution_id: str, db: AsyncSession = Depends(get_async_db)):
     """Abort an execution (cannot be resumed)."""
     try:
         result = await execution_engine.abort_execution(execution_id, db)
@@ -899,7 +1044,7 @@ async def delete_execution(execution_id: str, db: Session = Depends(get_db)):
     """Delete an individual execution record."""
     try:
         # Find the execution
-        execution = db.query(Execution).filter(Execution.id == execution_id).first()
+        execution = db.get(Execution, execution_id)
         if not execution:
             raise HTTPException(status_code=404, detail="Execution not found")
         
@@ -929,17 +1074,17 @@ async def delete_execution(execution_id: str, db: Session = Depends(get_db)):
 
 # Dashboard and System Status Endpoints
 @app.get("/api/dashboard/status", response_model=SystemStatus)
-async def get_system_status(db: Session = Depends(get_db)):
+async def get_system_status(db: AsyncSession = Depends(get_async_db)):
     """Get overall system status and metrics."""
-    status = execution_engine.get_system_status(db)
-    return status
+    status = await execution_engine.get_system_status(db)
+    return model_response(status)
 
 
 @app.get("/api/dashboard/agents", response_model=List[AgentStatusSummary])
-async def get_agent_status_summary(db: Session = Depends(get_db)):
+async def get_agent_status_summary(db: AsyncSession = Depends(get_async_db)):
     """Get summary of all agent statuses."""
     summaries = await agent_manager.get_agent_status_summaries(db)
-    return summaries
+    return model_response(summaries)
 
 
 # Advanced Orchestration Endpoints
@@ -1326,7 +1471,7 @@ async def update_workflow_pattern(
     
     try:
         # Find existing pattern
-        pattern = db.query(WorkflowPattern).filter(WorkflowPattern.id == pattern_id).first()
+        pattern = db.get(WorkflowPattern, pattern_id)
         if not pattern:
             raise HTTPException(status_code=404, detail="Workflow pattern not found")
         
@@ -1417,7 +1562,7 @@ async def delete_workflow_pattern(
     
     try:
         # Check if pattern exists
-        pattern = db.query(WorkflowPattern).filter(WorkflowPattern.id == pattern_id).first()
+        pattern = db.get(WorkflowPattern, pattern_id)
         if not pattern:
             raise HTTPException(status_code=404, detail=f"Workflow pattern with ID '{pattern_id}' not found")
         
@@ -1547,7 +1692,7 @@ async def execute_workflow_pattern(
     
     try:
         # Get pattern from database with validation
-        db_pattern = db.query(WorkflowPattern).filter(WorkflowPattern.id == pattern_id).first()
+        db_pattern = db.get(WorkflowPattern, pattern_id)
         if not db_pattern:
             raise HTTPException(status_code=404, detail=f"Workflow pattern with ID '{pattern_id}' not found")
         
@@ -1798,7 +1943,7 @@ async def list_workflow_executions(
         
         if pattern_id:
             # Validate pattern exists
-            pattern = db.query(WorkflowPattern).filter(WorkflowPattern.id == pattern_id).first()
+            pattern = db.get(WorkflowPattern, pattern_id)
             if not pattern:
                 raise HTTPException(status_code=404, detail=f"Pattern with ID '{pattern_id}' not found")
             query = query.filter(WorkflowExecution.pattern_id == pattern_id)
@@ -1826,7 +1971,7 @@ async def list_workflow_executions(
             # Get pattern info
             pattern_info = None
             if include_details and execution.pattern_id:
-                pattern = db.query(WorkflowPattern).filter(WorkflowPattern.id == execution.pattern_id).first()
+                pattern = db.get(WorkflowPattern, execution.pattern_id)
                 if pattern:
                     pattern_info = {
                         "name": pattern.name,
@@ -1873,9 +2018,14 @@ async def list_workflow_executions(
         # Calculate summary statistics
         status_counts = {}
         if status == "all":
-            for stat_status in ["running", "paused", "completed", "failed", "cancelled", "starting"]:
-                count = db.query(WorkflowExecution).filter(WorkflowExecution.status == stat_status).count()
-                status_counts[stat_status] = count
+            # One GROUP BY instead of a COUNT per status; statuses without rows report 0
+            stat_statuses = ["running", "paused", "completed", "failed", "cancelled", "starting"]
+            counts_by_status = dict(db.execute(
+                select(WorkflowExecution.status, func.count())
+                .where(WorkflowExecution.status.in_(stat_statuses))
+                .group_by(WorkflowExecution.status)
+            ).all())
+            status_counts = {stat_status: counts_by_status.get(stat_status, 0) for stat_status in stat_statuses}
         
         # Enhanced response
         response = {
@@ -1930,7 +2080,7 @@ async def abort_workflow_execution(execution_id: str, db: Session = Depends(get_
     
     try:
         # Find the execution
-        execution = db.query(WorkflowExecution).filter(WorkflowExecution.id == execution_id).first()
+        execution = db.get(WorkflowExecution, execution_id)
         if not execution:
             raise HTTPException(status_code=404, detail="Workflow execution not found")
         
@@ -1964,7 +2114,7 @@ async def delete_workflow_execution(execution_id: str, db: Session = Depends(get
     
     try:
         # Find the execution
-        execution = db.query(WorkflowExecution).filter(WorkflowExecution.id == execution_id).first()
+        execution = db.get(WorkflowExecution, execution_id)
         if not execution:
             raise HTTPException(status_code=404, detail="Workflow execution not found")
         
@@ -2120,8 +2270,13 @@ async def get_workflow_system_health(db: Session = Depends(get_db)):
         
         # Workflow pattern health
         try:
-            total_patterns = db.query(WorkflowPattern).count()
-            active_patterns = db.query(WorkflowPattern).filter(WorkflowPattern.status == "active").count()
+            # Both counts from one scan
+            total_patterns, active_patterns = db.execute(
+                select(
+                    func.count(),
+                    func.count().filter(WorkflowPattern.status == "active")
+                ).select_from(WorkflowPattern)
+            ).one()
             
             health_data["checks"]["workflow_patterns"] = {
                 "status": "healthy",
@@ -2142,20 +2297,17 @@ async def get_workflow_system_health(db: Session = Depends(get_db)):
         
         # Execution health
         try:
-            total_executions = db.query(WorkflowExecution).count()
-            running_executions = db.query(WorkflowExecution).filter(
-                WorkflowExecution.status.in_(["running", "starting"])
-            ).count()
-            failed_executions = db.query(WorkflowExecution).filter(
-                WorkflowExecution.status == "failed"
-            ).count()
-            
-            # Check for stuck executions (running for > 1 hour)
+            # Stuck executions have been running for over an hour; all four counts come from one scan
             one_hour_ago = datetime.utcnow() - timedelta(hours=1)
-            stuck_executions = db.query(WorkflowExecution).filter(
-                WorkflowExecution.status.in_(["running", "starting"]),
-                WorkflowExecution.start_time < one_hour_ago
-            ).count()
+            is_running = WorkflowExecution.status.in_(["running", "starting"])
+            total_executions, running_executions, failed_executions, stuck_executions = db.execute(
+                select(
+                    func.count(),
+                    func.count().filter(is_running),
+                    func.count().filter(WorkflowExecution.status == "failed"),
+                    func.count().filter(is_running, WorkflowExecution.start_time < one_hour_ago)
+                ).select_from(WorkflowExecution)
+            ).one()
             
             health_data["checks"]["executions"] = {
                 "status": "healthy",
@@ -2637,4 +2789,8 @@ async def get_system_metrics(db: Session = Depends(get_db)):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    # Reload needs the app as an import string. The default "auto" loop and HTTP
+    # implementations pick uvloop and httptools when uvicorn[standard] is installed.
+    # Dashboards poll every few seconds, so keep their connections open between polls.
+    # Executions live in this process's memory, so the server stays single-process.
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True, timeout_keep_alive=30)
\ No newline at end of file
@@ -3,16 +3,34 @@ Database models for dynamic multi-agent system.
 """
 
 from datetime import datetime
-from typing import Dict, List, Optional, Any
-from sqlalchemy import Column, String, Text, DateTime, JSON, ForeignKey, Enum, Boolean
+from typing import Dict, List, Optional, Any, Tuple
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, ForeignKey, Enum, Boolean, Index, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
+import os
+import time
 import uuid
 import enum
 
 Base = declarative_base()
 
 
+def uuid7() -> uuid.UUID:
+    """
+    Time-ordered UUID (RFC 9562 version 7): 48 bits of Unix milliseconds, then random bits.
+    New keys land at the end of the primary key index instead of on a random page.
+    """
+    ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    return uuid.UUID(int=(
+        (ms & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76                        # version
+        | (rand >> 62 & 0xFFF) << 64       # rand_a
+        | 0b10 << 62                       # variant
+        | rand & 0x3FFF_FFFF_FFFF_FFFF     # rand_b
+    ))
+
+
 class AgentStatus(str, enum.Enum):
     IDLE = "idle"
     EXECUTING = "executing"
@@ -38,6 +56,14 @@ class TaskPriority(str, enum.Enum):
 class Agent(Base):
     """Dynamic agent definition model."""
     __tablename__ = "agents"
+    __table_args__ = (
+        # Small partial index for lookups of executing agents (active counts, busy checks)
+        Index(
+            "ix_agents_status_executing", "status",
+            postgresql_where=text("status = 'EXECUTING'"),
+            sqlite_where=text("status = 'EXECUTING'")
+        ),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     name = Column(String(255), nullable=False, unique=True)
@@ -56,7 +82,7 @@ class Agent(Base):
     execution_settings = Column(JSON, default=dict)  # Execution parameters
     
     # Status and metadata
-    status = Column(Enum(AgentStatus), default=AgentStatus.IDLE)
+    status = Column(Enum(AgentStatus), default=AgentStatus.IDLE)  # Only ix_agents_status_executing indexes it
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_active = Column(DateTime)
@@ -64,6 +90,11 @@ class Agent(Base):
     # Relationships
     tasks = relationship("Task", back_populates="assigned_agents", secondary="task_agent_assignments")
     executions = relationship("Execution", back_populates="agent")
+    
+    @property
+    def top_capabilities(self) -> Tuple[str, ...]:
+        """First three capabilities; read from capabilities each time so it never goes stale."""
+        return tuple((self.capabilities or [])[:3])
 
 
 class Task(Base):
@@ -85,7 +116,7 @@ class Task(Base):
     estimated_duration = Column(String(50))  # e.g., "2 hours", "30 minutes"
     
     # Status and results
-    status = Column(Enum(TaskStatus), default=TaskStatus.PENDING)
+    status = Column(Enum(TaskStatus), default=TaskStatus.PENDING, index=True)
     results = Column(JSON, default=dict)  # Task execution results
     error_message = Column(Text)  # Error details if failed
     
@@ -114,13 +145,17 @@ class TaskAgentAssignment(Base):
 class Execution(Base):
     """Task execution tracking model."""
     __tablename__ = "executions"
+    __table_args__ = (
+        # Per-agent lookups by status, and the per-agent counts of executions completed since a time
+        Index("ix_executions_agent_id_status_end_time", "agent_id", "status", "end_time"),
+    )
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid7()))
     task_id = Column(String(36), ForeignKey("tasks.id"))
     agent_id = Column(String(36), ForeignKey("agents.id"))
     
     # Execution details
-    status = Column(String(50), default="started")
+    status = Column(String(50), default="started", index=True)
     start_time = Column(DateTime, default=datetime.utcnow)
     end_time = Column(DateTime)
     
@@ -140,6 +175,61 @@ class Execution(Base):
     # Relationships
     task = relationship("Task", back_populates="executions")
     agent = relationship("Agent", back_populates="executions")
+    execution_agents = relationship("ExecutionAgent", cascade="all, delete-orphan")
+    log_entries = relationship(
+        "ExecutionLog", back_populates="execution", cascade="all, delete-orphan", order_by="ExecutionLog.id"
+    )
+
+
+class ExecutionAgent(Base):
+    """Agents taking part in an execution, one row each; agent_id on the execution is the primary."""
+    __tablename__ = "execution_agents"
+    __table_args__ = (
+        # Lookups by agent; the primary key already serves lookups by execution
+        Index("ix_execution_agents_agent_id_execution_id", "agent_id", "execution_id"),
+    )
+    
+    execution_id = Column(String(36), ForeignKey("executions.id", ondelete="CASCADE"), primary_key=True)
+    agent_id = Column(String(36), ForeignKey("agents.id", ondelete="CASCADE"), primary_key=True)
+    role = Column(String(255))  # "primary" or "collaborator"
+
+
+# Keyset index for the newest-first execution list; on Postgres it also carries the
+# summary columns so listing pages is an index-only scan
+Index(
+    "ix_executions_start_time_id",
+    Execution.start_time.desc(),
+    Execution.id.desc(),
+    postgresql_include=["task_id", "agent_id", "status", "end_time", "duration_seconds"]
+)
+
+
+class ExecutionLog(Base):
+    """Append-only execution log entry, one row per message."""
+    __tablename__ = "execution_logs"
+    __table_args__ = (
+        Index("ix_execution_logs_execution_id_timestamp", "execution_id", "timestamp"),
+    )
+    
+    # Integer key keeps insertion order for entries that share a timestamp
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    execution_id = Column(String(36), ForeignKey("executions.id"), nullable=False)
+    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
+    level = Column(String(20), default="info")
+    message = Column(Text, nullable=False)
+    agent_id = Column(String(36))
+    details = Column(JSON, default=dict)  # Any extra fields attached to the entry
+    
+    # Relationships
+    execution = relationship("Execution", back_populates="log_entries")
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the entry in the same shape as items of Execution.logs."""
+        entry = {"timestamp": self.timestamp.isoformat(), "message": self.message, "level": self.level}
+        if self.agent_id:
+            entry["agent_id"] = self.agent_id
+        entry.update(self.details or {})
+        return entry
 
 
 class AgentCommunication(Base):
@@ -79,6 +79,18 @@ class AgentResponse(BaseModel):
         from_attributes = True
 
 
+class AgentListItem(BaseModel):
+    """The columns agent listings show; prompts and settings are left out."""
+    id: str
+    name: str
+    role: str
+    status: AgentStatus
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
 # Task Schemas
 class TaskCreate(BaseModel):
     title: str = Field(..., min_length=1, max_length=255)
@@ -129,6 +141,19 @@ class TaskResponse(BaseModel):
         from_attributes = True
 
 
+class TaskListItem(BaseModel):
+    """The columns task listings show; descriptions, results and assigned agents are left out."""
+    id: str
+    title: str
+    status: TaskStatus
+    priority: TaskPriority
+    deadline: Optional[datetime]
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
 # Execution Schemas
 class ExecutionResponse(BaseModel):
     id: str
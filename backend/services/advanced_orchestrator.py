@@ -16,9 +16,16 @@ from pydantic import BaseModel
 # Import mcp-agent workflow patterns - only essential imports for data conversion
 from mcp_agent.agents.agent import Agent as MCPAgent
 
+from database import AsyncSessionLocal
 from models import Agent, Task, Execution
 
 
+async def _start_engine_execution(execution_engine: Any, request: Any):
+    """Start a task on the execution engine, which works on AsyncSessions, in a session of its own."""
+    async with AsyncSessionLocal() as db:
+        return await execution_engine.start_task_execution(db, request)
+
+
 class WorkflowType(str, Enum):
     """Advanced workflow pattern types"""
     SEQUENTIAL = "sequential"
@@ -541,7 +548,7 @@ class AdvancedOrchestrator:
             
             try:
                 # Execute task with proven Claude SDK approach
-                result = await execution_engine.start_task_execution(db, request)
+                result = await _start_engine_execution(execution_engine, request)
                 results.append({
                     "task_id": task.id,
                     "agent_id": agent.id,
@@ -617,7 +624,7 @@ class AdvancedOrchestrator:
         
         try:
             for i, (request, (agent, task)) in enumerate(zip(execution_requests, agent_task_pairs)):
-                response = await execution_engine.start_task_execution(db, request)
+                response = await _start_engine_execution(execution_engine, request)
                 concurrent_executions.append({
                     "execution_id": response.execution_id,
                     "agent": agent,
@@ -688,7 +695,7 @@ class AdvancedOrchestrator:
             return {
                 "status": execution.status,
                 "output": execution.output,
-                "logs": execution.logs,
+                "logs": (execution.logs or []) + [entry.to_dict() for entry in execution.log_entries],
                 "duration": execution.duration_seconds
             }
         
@@ -741,7 +748,7 @@ class AdvancedOrchestrator:
             
             try:
                 # Execute the routed task
-                response = await execution_engine.start_task_execution(db, request)
+                response = await _start_engine_execution(execution_engine, request)
                 execution_results.append({
                     "task_id": task.id,
                     "agent_id": best_agent.id,
@@ -865,7 +872,7 @@ class AdvancedOrchestrator:
                 
                 try:
                     # Execute task for this optimization iteration
-                    response = await execution_engine.start_task_execution(db, request)
+                    response = await _start_engine_execution(execution_engine, request)
                     execution_id = response.execution_id
                     
                     # Wait for completion and evaluate results
@@ -983,7 +990,7 @@ class AdvancedOrchestrator:
                     
                     try:
                         # Launch swarm execution
-                        response = await execution_engine.start_task_execution(db, request)
+                        response = await _start_engine_execution(execution_engine, request)
                         execution_id = response.execution_id
                         
                         round_results.append({
@@ -1080,7 +1087,7 @@ class AdvancedOrchestrator:
             
             try:
                 # Execute this task and wait for completion
-                response = await execution_engine.start_task_execution(db, request)
+                response = await _start_engine_execution(execution_engine, request)
                 execution_id = response.execution_id
                 
                 execution_order.append(f"Step {i+1}: {agent.name} -> {task.title}")
@@ -1146,7 +1153,7 @@ class AdvancedOrchestrator:
                 return {
                     "status": execution.status,
                     "output": execution.output,
-                    "logs": execution.logs,
+                    "logs": (execution.logs or []) + [entry.to_dict() for entry in execution.log_entries],
                     "duration": execution.duration_seconds
                 }
             
@@ -1219,7 +1226,7 @@ class AdvancedOrchestrator:
                 )
                 
                 try:
-                    response = await execution_engine.start_task_execution(db, request)
+                    response = await _start_engine_execution(execution_engine, request)
                     concurrent_executions.append({
                         "strategy": current_strategy,
                         "task_id": task.id,
@@ -1259,7 +1266,7 @@ class AdvancedOrchestrator:
                 )
                 
                 try:
-                    response = await execution_engine.start_task_execution(db, request)
+                    response = await _start_engine_execution(execution_engine, request)
                     adaptive_results.append({
                         "strategy": current_strategy,
                         "step": i + 1,
@@ -1305,7 +1312,7 @@ class AdvancedOrchestrator:
                 )
                 
                 try:
-                    response = await execution_engine.start_task_execution(db, request)
+                    response = await _start_engine_execution(execution_engine, request)
                     adaptive_results.append({
                         "strategy": current_strategy,
                         "task_id": task.id,
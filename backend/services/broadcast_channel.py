@@ -0,0 +1,59 @@
+"""
+Redis pub/sub channel that carries WebSocket broadcasts between processes.
+
+When BROADCAST_REDIS_URL is set, every broadcast is published here. Each API
+worker relays what arrives to its own WebSocket clients, so clients see events
+from every API worker and from Celery workers, which have no clients and only publish.
+"""
+
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import orjson
+
+BROADCAST_REDIS_URL = os.getenv("BROADCAST_REDIS_URL")
+BROADCAST_CHANNEL = os.getenv("BROADCAST_CHANNEL", "ws_broadcast")
+
+# Payload datetimes are naive UTC; orjson writes them as ISO 8601 with a Z suffix
+BROADCAST_JSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+
+
+def encode_broadcast(message: Dict[str, Any]) -> bytes:
+    """Stamp a broadcast with its id and server time and serialize it once for every client."""
+    message["broadcast_id"] = str(uuid.uuid4())
+    message["server_timestamp"] = datetime.utcnow()
+    return orjson.dumps(message, option=BROADCAST_JSON_OPTIONS)
+
+
+def pack(data: bytes, subscription_filter: Optional[str]) -> bytes:
+    """Frame an encoded broadcast for the channel as "<subscription filter>\\n<json>"."""
+    return (subscription_filter or "").encode() + b"\n" + data
+
+
+def unpack(frame: bytes) -> Tuple[bytes, Optional[str]]:
+    """Split a channel frame back into the encoded broadcast and its subscription filter."""
+    subscription_filter, _, data = frame.partition(b"\n")
+    return data, subscription_filter.decode() or None
+
+
+def redis_client():
+    """Client for BROADCAST_REDIS_URL, or None when broadcasts stay in-process."""
+    if not BROADCAST_REDIS_URL:
+        return None
+    from redis import asyncio as redis_asyncio
+    return redis_asyncio.from_url(BROADCAST_REDIS_URL)
+
+
+class RedisBroadcaster:
+    """Publish-only stand-in for the WebSocket manager in processes without clients."""
+
+    def __init__(self, client: Any):
+        self._client = client
+
+    async def broadcast(self, message: Dict[str, Any], subscription_filter: str = None):
+        await self._client.publish(BROADCAST_CHANNEL, pack(encode_broadcast(message), subscription_filter))
+
+    async def close(self):
+        await self._client.connection_pool.disconnect()
@@ -4,47 +4,674 @@ FIXED VERSION: Added timeouts and fallbacks to prevent stuck executions.
 """
 
 import asyncio
-import json
+import functools
+import logging
+import re
+import shutil
+import socket
 import time
+import weakref
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Any, Set, Tuple
 from pathlib import Path
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import and_, or_, bindparam, func, insert, null, select, update
 
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from models import Agent, Task, Execution, AgentStatus, TaskStatus
+from database import AsyncSessionLocal, STATE_CHANGE_CHANNEL, async_engine
+from models import Agent, Task, Execution, ExecutionAgent, ExecutionLog, AgentStatus, TaskStatus, uuid7
 from schemas import TaskExecutionRequest, ExecutionResponse, SystemStatus, TaskExecutionResponse
 
+logger = logging.getLogger(__name__)
+
+# Resolved once at import; executions fail fast with a clear error when it is missing
+CLAUDE_BIN = shutil.which("claude")
+if CLAUDE_BIN is None:
+    logger.warning("Claude CLI not found on PATH - task executions will fail until claude-code-cli is installed")
+
+# Executions allowed to run at once, shared by every engine instance in the process
+# (workflow orchestration creates its own engines). Others wait as "starting".
+MAX_CONCURRENT_EXECUTIONS = int(os.getenv("MAX_CONCURRENT_EXECUTIONS", "32"))
+
+# Claude CLI runs allowed at once across all executions; multi-agent executions run one per agent
+AGENT_MAX_CONCURRENCY = int(os.getenv("AGENT_MAX_CONCURRENCY", "20"))
+
+# event loop -> its semaphores. Python 3.9 binds a semaphore to the loop current when it is
+# built, and this module is imported before the server's loop starts, so they are built on first use
+_loop_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _loop_semaphore(name: str, value: int) -> asyncio.Semaphore:
+    """The running loop's semaphore called name, created with value slots on first use."""
+    semaphores = _loop_semaphores.setdefault(asyncio.get_running_loop(), {})
+    if name not in semaphores:
+        semaphores[name] = asyncio.Semaphore(value)
+    return semaphores[name]
+
+
+def _execution_slots() -> asyncio.Semaphore:
+    return _loop_semaphore("executions", MAX_CONCURRENT_EXECUTIONS)
+
+
+def _agent_slots() -> asyncio.Semaphore:
+    return _loop_semaphore("agents", AGENT_MAX_CONCURRENCY)
+
+# "local" runs executions in this process; "celery" hands them to tasks.run_agent_task
+EXECUTION_BACKEND = os.getenv("EXECUTION_BACKEND", "local")
+
+# When set, runs are recorded in Redis hashes (exec:<id>) and stop requests go out on
+# exec_ctl:<id>, so any API replica can stop an execution another process is running
+STATE_REDIS_URL = os.getenv("STATE_REDIS_URL")
+
+async def _run_with_timeout(awaitable, timeout: float):
+    """Await with a deadline, raising asyncio.TimeoutError when it passes.
+    
+    asyncio.timeout (Python 3.11+) runs the awaitable in the current task with one
+    scheduled callback; older interpreters fall back to wait_for and its wrapper task.
+    """
+    if hasattr(asyncio, "timeout"):
+        async with asyncio.timeout(timeout):
+            return await awaitable
+    return await asyncio.wait_for(awaitable, timeout=timeout)
+
+
+# Matches the leading amount in estimated durations such as "2 hours" or "30 minutes"
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(hour|minute|second)s?", re.IGNORECASE)
+_DURATION_UNIT_SECONDS = {"hour": 3600, "minute": 60, "second": 1}
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_duration(duration: str) -> Optional[float]:
+    """Convert an estimated duration like "2 hours" to seconds; None if it can't be read."""
+    match = _DURATION_RE.search(duration)
+    if not match:
+        return None
+    return float(match.group(1)) * _DURATION_UNIT_SECONDS[match.group(2).lower()]
+
+
+def _format_log_timestamps(entries: List[Dict[str, Any]]):
+    """Replace the time_ns() stamps of buffered log entries with ISO strings.
+    
+    Each distinct millisecond is formatted once, so a burst of entries shares one
+    string. Entries are shared between the commit and broadcast queues, so
+    whichever flushes first formats them and the other finds strings.
+    """
+    formatted: Dict[int, str] = {}
+    for entry in entries:
+        stamp = entry["timestamp"]
+        if isinstance(stamp, int):
+            ms = stamp // 1_000_000
+            if ms not in formatted:
+                formatted[ms] = datetime.utcfromtimestamp(ms / 1000).isoformat()
+            entry["timestamp"] = formatted[ms]
+
+
+def _log_row_timestamp(entry: Dict[str, Any]) -> datetime:
+    """Timestamp of a buffered log entry as a datetime, whether or not it was formatted yet."""
+    stamp = entry["timestamp"]
+    if isinstance(stamp, int):
+        return datetime.utcfromtimestamp(stamp // 1_000_000 / 1000)
+    return datetime.fromisoformat(stamp)
+
+
+# Parent of the default per-execution working directories; created once by the engine
+EXECUTIONS_ROOT = Path("./claude_executions")
+
+
+def _write_claude_md(work_path: Path, content: str):
+    """Create the working directory and write its CLAUDE.md context file."""
+    # One mkdir when the parent exists (the usual case); walk the parents only when it doesn't
+    try:
+        work_path.mkdir()
+    except FileExistsError:
+        pass
+    except FileNotFoundError:
+        work_path.mkdir(parents=True, exist_ok=True)
+    with open(work_path / "CLAUDE.md", 'w') as f:
+        f.write(content)
+
+
+# Columns the execution listing reads, selected directly instead of loading ORM objects
+EXECUTION_COLUMNS = (
+    Execution.id,
+    Execution.task_id,
+    Execution.agent_id,
+    Execution.status,
+    Execution.start_time,
+    Execution.end_time,
+    Execution.logs,
+    Execution.output,
+    Execution.error_details,
+    Execution.agent_response,
+    Execution.work_directory,
+    Execution.needs_interaction
+)
+# The same columns without the legacy JSON logs, for listings that leave logs out
+EXECUTION_SUMMARY_COLUMNS = tuple(
+    null().label("logs") if column is Execution.logs else column for column in EXECUTION_COLUMNS
+)
+
+# Idle Claude CLI processes kept ready per working directory and CLAUDE.md, and how many of those.
+# Off by default: a spare only pays off when the same directory is run again with the same CLAUDE.md
+CLAUDE_POOL_SPARES = int(os.getenv("CLAUDE_POOL_SPARES", "0"))
+CLAUDE_POOL_MAX_DIRS = int(os.getenv("CLAUDE_POOL_MAX_DIRS", "8"))
+# Longest stream-json line read from the CLI; tool results can carry whole files
+CLAUDE_STREAM_LINE_LIMIT = 16 * 1024 * 1024
+
+
+class ClaudeWorkerPool:
+    """Keeps pre-started Claude CLI processes ready for the next prompt in a directory.
+    
+    Processes run in print mode with stream-json input, so they start up and then
+    wait on stdin for their prompt. Each one serves exactly one prompt, keeping
+    tasks out of each other's conversations. What the pool saves is start-up time:
+    with spares enabled, each run in a recurring directory starts a spare in the
+    background, so the next run there gets a process that is already warm.
+    
+    The CLI reads CLAUDE.md as it starts, so spares are keyed by the CLAUDE.md they
+    started with and only serve runs that write the same context.
+    """
+    
+    def __init__(self, spares: int = CLAUDE_POOL_SPARES, max_dirs: int = CLAUDE_POOL_MAX_DIRS):
+        self.spares = spares
+        self.max_dirs = max_dirs
+        # (work_dir, CLAUDE.md) -> idle processes, least recently used first
+        self._idle: "OrderedDict[Tuple[str, str], List[asyncio.subprocess.Process]]" = OrderedDict()
+        # work_dir -> lock held while its CLAUDE.md is written and its processes taken or started
+        self._dir_locks: Dict[str, asyncio.Lock] = {}
+        # work_dir -> the CLAUDE.md last written there
+        self._dir_contexts: Dict[str, str] = {}
+        # Spare starts in flight; held here so they can't be collected mid-run and close() can stop them
+        self._replenishers: Set[asyncio.Task] = set()
+    
+    async def _spawn(self, work_dir: str) -> asyncio.subprocess.Process:
+        return await asyncio.create_subprocess_exec(
+            CLAUDE_BIN,
+            "-p",
+            "--input-format", "stream-json",
+            "--output-format", "stream-json",
+            "--verbose",  # Required by the CLI for stream-json output in print mode
+            "--dangerously-skip-permissions",
+            cwd=work_dir,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=CLAUDE_STREAM_LINE_LIMIT
+        )
+    
+    async def acquire(self, work_dir: str, claude_md: str, keep_spares: bool = True) -> asyncio.subprocess.Process:
+        """Write CLAUDE.md to work_dir and return a process started with it.
+        
+        An idle process that started with the same CLAUDE.md is reused, otherwise one
+        is started. With keep_spares, the directory's spares are then topped up in the
+        background; pass False for directories that won't be run again. The directory
+        lock makes concurrent runs take distinct processes.
+        """
+        key = (work_dir, claude_md)
+        async with self._dir_locks.setdefault(work_dir, asyncio.Lock()):
+            # Filesystem work runs on a thread so slow storage doesn't stall the event loop
+            await asyncio.to_thread(_write_claude_md, Path(work_dir), claude_md)
+            self._dir_contexts[work_dir] = claude_md
+            
+            idle = self._idle.get(key, [])
+            process = None
+            while idle and process is None:
+                candidate = idle.pop()
+                if candidate.returncode is None:
+                    process = candidate
+            if process is None:
+                process = await self._spawn(work_dir)
+        
+        if self.spares and keep_spares:
+            replenisher = asyncio.create_task(self._replenish(key))
+            self._replenishers.add(replenisher)
+            replenisher.add_done_callback(self._replenishers.discard)
+        elif not self._dir_locks[work_dir].locked() and not any(other[0] == work_dir for other in self._idle):
+            # Nothing kept for this directory, so don't keep its lock either
+            del self._dir_locks[work_dir]
+            self._dir_contexts.pop(work_dir, None)
+        return process
+    
+    async def _replenish(self, key: Tuple[str, str]):
+        work_dir, claude_md = key
+        lock = self._dir_locks.setdefault(work_dir, asyncio.Lock())
+        async with lock:
+            # A later run rewrote CLAUDE.md; spares started now would not match this context
+            if self._dir_contexts.get(work_dir) != claude_md:
+                return
+            
+            # Spares for other contexts in this directory started with a CLAUDE.md that is now gone
+            for stale_key in [other for other in self._idle if other[0] == work_dir and other != key]:
+                await self._stop_idle(stale_key)
+            
+            idle = self._idle.setdefault(key, [])
+            self._idle.move_to_end(key)
+            try:
+                while len(idle) < self.spares:
+                    idle.append(await self._spawn(work_dir))
+            except Exception as e:
+                logger.warning("Could not start a spare Claude CLI process in %s: %s", work_dir, e)
+        
+        # Stop the spares of the least recently used directories beyond the limit
+        while len(self._idle) > self.max_dirs:
+            stale_key = next(iter(self._idle))
+            await self._stop_idle(stale_key)
+            stale_lock = self._dir_locks.get(stale_key[0])
+            if stale_lock is not None and not stale_lock.locked():
+                # Nobody is waiting on it; it is recreated on demand
+                del self._dir_locks[stale_key[0]]
+                self._dir_contexts.pop(stale_key[0], None)
+    
+    async def _stop_idle(self, key: Tuple[str, str]):
+        for process in self._idle.pop(key, []):
+            if process.returncode is None:
+                process.kill()
+            # Reap the process so its pipes and transport are closed
+            await process.wait()
+    
+    async def run(
+        self,
+        work_dir: str,
+        claude_md: str,
+        prompt: str,
+        spawn_timeout: float,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+        keep_spares: bool = True
+    ) -> Tuple[Optional[Dict[str, Any]], str, bytes, int]:
+        """Write CLAUDE.md, send one prompt and collect the outcome.
+        
+        Messages are read line by line as the CLI streams them and handed to
+        on_event as they arrive. Returns the CLI's final result message (None if
+        it sent none), any non-JSON output, stderr and the return code. Only getting a process is
+        bounded by spawn_timeout; callers bound the run itself. The process is
+        killed if the caller is cancelled or times out mid-run. keep_spares is passed to acquire().
+        """
+        process = await _run_with_timeout(self.acquire(work_dir, claude_md, keep_spares), spawn_timeout)
+        try:
+            message = {"type": "user", "message": {"role": "user", "content": prompt}}
+            process.stdin.write(orjson.dumps(message) + b"\n")
+            await process.stdin.drain()
+            process.stdin.close()
+            
+            async def read_stdout() -> Tuple[Optional[Dict[str, Any]], str]:
+                result, text_lines = None, []
+                async for line in process.stdout:
+                    try:
+                        event = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        text_lines.append(line.decode().rstrip())
+                        continue
+                    if not isinstance(event, dict):
+                        continue
+                    if event.get("type") == "result":
+                        result = event
+                    elif on_event:
+                        on_event(event)
+                return result, "\n".join(text_lines).strip()
+            
+            # stderr is drained alongside stdout so neither pipe can fill up and stall the CLI
+            (result, text), stderr = await asyncio.gather(read_stdout(), process.stderr.read())
+            returncode = await process.wait()
+            return result, text, stderr, returncode
+        except BaseException:
+            if process.returncode is None:
+                process.kill()
+            raise
+    
+    async def close(self):
+        """Stop spare starts in flight and every idle process."""
+        replenishers = list(self._replenishers)
+        for replenisher in replenishers:
+            replenisher.cancel()
+        await asyncio.gather(*replenishers, return_exceptions=True)
+        for key in list(self._idle):
+            await self._stop_idle(key)
+        self._dir_locks.clear()
+        self._dir_contexts.clear()
+
+
+# Shared by every engine instance in the process
+claude_pool = ClaudeWorkerPool()
+
+# Log rows of a set of executions, in write order
+LOGS_BY_EXECUTION_IDS_QUERY = (
+    select(ExecutionLog)
+    .where(ExecutionLog.execution_id.in_(bindparam("execution_ids", expanding=True)))
+    .order_by(ExecutionLog.execution_id, ExecutionLog.timestamp, ExecutionLog.id)
+)
+
+# Agents of an execution by primary key, built once and reused with the ids bound per call
+AGENTS_BY_IDS_QUERY = select(Agent).where(Agent.id.in_(bindparam("agent_ids", expanding=True)))
+AGENT_IDS_QUERY = select(Agent.id).where(Agent.id.in_(bindparam("agent_ids", expanding=True)))
+BUSY_AGENT_NAMES_QUERY = select(Agent.name).where(
+    Agent.id.in_(bindparam("agent_ids", expanding=True)),
+    Agent.status == AgentStatus.EXECUTING
+)
+
+# Executions whose agents are busy; agents count as active while they take part in one
+ACTIVE_EXECUTION_STATUSES = ("starting", "running")
+# Executions that never run again
+FINISHED_EXECUTION_STATUSES = ("completed", "failed", "cancelled")
+
+# Every system status count in one round trip: agent totals as scalar subqueries,
+# task buckets as COUNT(*) FILTER (WHERE ...) columns of a single scan
+_TASK_COUNTS = select(
+    func.count().label("total"),
+    *(func.count().filter(Task.status == status).label(status.value) for status in (
+        TaskStatus.PENDING, TaskStatus.IN_PROGRESS, TaskStatus.COMPLETED, TaskStatus.FAILED
+    ))
+).select_from(Task).subquery()
+SYSTEM_COUNTS_QUERY = select(
+    select(func.count()).select_from(Agent).scalar_subquery(),
+    select(func.count(ExecutionAgent.agent_id.distinct()))
+    .join(Execution, Execution.id == ExecutionAgent.execution_id)
+    .where(Execution.status.in_(ACTIVE_EXECUTION_STATUSES))
+    .scalar_subquery(),
+    *_TASK_COUNTS.c
+)
+
+# Dashboards poll the status endpoint; answers younger than this are served from memory
+# until an execution transition or agent/task change invalidates them
+SYSTEM_STATUS_TTL_SECONDS = 2.0
+
+# Log entries for WebSocket clients are coalesced and sent once per interval (seconds)
+LOG_BROADCAST_INTERVAL = 0.05
+
 
 class ExecutionEngine:
     """Manages asynchronous execution of tasks by agents with timeout controls."""
     
+    # Expert fallback responses: the first keyword found in the agent's role picks the template
+    _ROLE_TEMPLATES = (
+        ("backend", "Backend task '{title}' analyzed. Would implement API endpoints, database models, and error handling according to FastAPI best practices."),
+        ("frontend", "Frontend task '{title}' analyzed. Would create React components with TypeScript, Chakra UI styling, and proper state management."),
+        ("test", "Testing task '{title}' analyzed. Would create comprehensive test suites including unit tests, integration tests, and performance tests.")
+    )
+    _DEFAULT_ROLE_TEMPLATE = "Task '{title}' completed by {name}. Applied {role} expertise to fulfill requirements."
+    
     def __init__(self):
         self.running_executions: Dict[str, asyncio.Task] = {}
         self.paused_executions: Dict[str, Dict[str, Any]] = {}
+        # Serialises pause/resume/abort so their check-then-act steps can't interleave across awaits;
+        # see _control_lock for why it is created on first use
+        self._control_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = (
+            weakref.WeakKeyDictionary()
+        )
         self.agent_instances: Dict[str, Any] = {}
         self.websocket_manager = None
         
+        # Connected by start_control_listener when STATE_REDIS_URL is set
+        self._state = None
+        self._control_listener: Optional[asyncio.Task] = None
+        self._state_change_listener: Optional[asyncio.Task] = None
+        
+        # execution_id -> log entries not yet written to Execution.logs
+        self._pending_logs: Dict[str, List[Dict[str, Any]]] = {}
+        # execution_id -> log entries not yet sent to WebSocket clients
+        self._pending_log_broadcasts: Dict[str, List[Dict[str, Any]]] = {}
+        self._log_broadcaster: Optional[asyncio.Task] = None
+        self._system_status_cache: Optional[Tuple[float, int, SystemStatus]] = None  # (monotonic time, generation, status)
+        # Bumped on every change that affects the counts; cached answers from older generations are stale
+        self._system_status_generation = 0
+        # execution_id -> response as of its last commit, for executions still starting or running
+        self._snapshots: Dict[str, ExecutionResponse] = {}
+        
         # Timeout settings
         self.DEFAULT_TIMEOUT = 300  # 5 minutes
         self.MAX_TIMEOUT = 600     # 10 minutes
         
+        # Default working directories then need a single mkdir each
+        EXECUTIONS_ROOT.mkdir(exist_ok=True)
+        
     def set_websocket_manager(self, websocket_manager: Any):
         """Inject WebSocket manager for real-time updates."""
         self.websocket_manager = websocket_manager
     
-    async def start_task_execution(self, db: Session, request: TaskExecutionRequest) -> TaskExecutionResponse:
+    @property
+    def _control_lock(self) -> asyncio.Lock:
+        """The running loop's control lock, created on first use.
+        
+        The global engine is built at import, before the server's loop starts, and
+        Python 3.9 binds a lock to the loop current when it is built.
+        """
+        loop = asyncio.get_running_loop()
+        lock = self._control_locks.get(loop)
+        if lock is None:
+            lock = self._control_locks[loop] = asyncio.Lock()
+        return lock
+    
+    async def start_control_listener(self):
+        """Connect to STATE_REDIS_URL and cancel local runs when any process asks for them to be stopped."""
+        if not STATE_REDIS_URL or self._control_listener is not None:
+            return
+        from redis import asyncio as redis_asyncio
+        self._state = redis_asyncio.from_url(STATE_REDIS_URL, decode_responses=True)
+        self._control_listener = asyncio.create_task(self._listen_for_control())
+    
+    async def stop_control_listener(self):
+        """Stop the control listener and disconnect from STATE_REDIS_URL."""
+        if self._control_listener is None:
+            return
+        self._control_listener.cancel()
+        try:
+            await self._control_listener
+        except asyncio.CancelledError:
+            pass
+        await self._state.connection_pool.disconnect()
+        self._control_listener = None
+        self._state = None
+    
+    async def _listen_for_control(self):
+        while True:
+            try:
+                async with self._state.pubsub() as pubsub:
+                    await pubsub.psubscribe("exec_ctl:*")
+                    async for message in pubsub.listen():
+                        if message["type"] != "pmessage" or message["data"] != "cancel":
+                            continue
+                        run = self.running_executions.get(message["channel"].split(":", 1)[1])
+                        if run is not None:
+                            run.cancel()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Execution control listener lost its Redis subscription, retrying: %s", e)
+                await asyncio.sleep(1)
+    
+    def start_state_change_listener(self):
+        """Follow STATE_CHANGE_CHANNEL so changes made by other processes reach this one.
+        
+        Does nothing on databases without LISTEN/NOTIFY.
+        """
+        if async_engine.dialect.name != "postgresql" or self._state_change_listener is not None:
+            return
+        self._state_change_listener = asyncio.create_task(self._listen_for_state_changes())
+    
+    async def stop_state_change_listener(self):
+        if self._state_change_listener is None:
+            return
+        self._state_change_listener.cancel()
+        try:
+            await self._state_change_listener
+        except asyncio.CancelledError:
+            pass
+        self._state_change_listener = None
+    
+    async def _listen_for_state_changes(self):
+        while True:
+            try:
+                async with async_engine.connect() as conn:
+                    listener = (await conn.get_raw_connection()).driver_connection
+                    await listener.add_listener(STATE_CHANGE_CHANNEL, self._on_state_change)
+                    try:
+                        await asyncio.Future()  # Notifications arrive on the callback until cancelled
+                    finally:
+                        await listener.remove_listener(STATE_CHANGE_CHANNEL, self._on_state_change)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("State change listener lost its database connection, retrying: %s", e)
+                await asyncio.sleep(1)
+    
+    async def _on_state_change(self, connection: Any, pid: int, channel: str, payload: str):
+        # Celery workers and other replicas change counts this process has cached
+        self.invalidate_system_status()
+        if self.websocket_manager:
+            change = orjson.loads(payload)
+            # Every API process listens for itself, so only its own clients are sent the change
+            await self.websocket_manager.broadcast(
+                {"type": "state_change", **change, "timestamp": datetime.utcnow()},
+                subscription_filter=change["table"],
+                local=True
+            )
+    
+    async def _set_run_owner(self, execution_id: str, owned: bool):
+        """Record (or clear) this process as the one running an execution."""
+        if self._state is None:
+            return
+        key = f"exec:{execution_id}"
+        try:
+            if owned:
+                await self._state.hset(key, mapping={
+                    "worker": socket.gethostname(),
+                    "pid": os.getpid(),
+                    "status": "running"
+                })
+            else:
+                await self._state.delete(key)
+        except Exception as e:
+            # Ownership only enables stopping the run from elsewhere; the run goes on without it
+            logger.warning("Failed to update run ownership for execution %s: %s", execution_id, e)
+    
+    async def _cancel_remote_run(self, execution_id: str, timeout: float = 5.0) -> bool:
+        """Ask the process running an execution to cancel it, waiting briefly for it to unwind.
+        
+        Returns False when no process has recorded the execution as its run.
+        """
+        key = f"exec:{execution_id}"
+        if not await self._state.exists(key):
+            return False
+        
+        await self._state.publish(f"exec_ctl:{execution_id}", "cancel")
+        # The owner deletes the key once its run has unwound
+        deadline = time.monotonic() + timeout
+        while await self._state.exists(key) and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        return True
+    
+    def _buffer_log(self, execution: Execution, message: str, level: str = "info"):
+        """Queue a log entry for the execution's next commit and the next coalesced broadcast."""
+        entry = {
+            "timestamp": time.time_ns(),  # Formatted when the entry is flushed
+            "message": message,
+            "level": level
+        }
+        self._pending_logs.setdefault(execution.id, []).append(entry)
+        
+        if self.websocket_manager:
+            self._pending_log_broadcasts.setdefault(execution.id, []).append(entry)
+            if self._log_broadcaster is None or self._log_broadcaster.done():
+                self._log_broadcaster = asyncio.create_task(self._broadcast_logs())
+    
+    async def _commit(self, db: AsyncSession, execution: Execution, new_execution: bool = False):
+        """Write the execution's queued log entries and commit; called at status transitions only.
+        
+        new_execution marks the first commit of an execution, which has no earlier logs to read back.
+        """
+        execution_id = execution.id
+        pending = self._pending_logs.pop(execution_id, None) or []
+        try:
+            if pending:
+                # Append-only rows in one executemany; the executions row is never rewritten for logs
+                await db.execute(insert(ExecutionLog), [
+                    {
+                        "execution_id": execution_id,
+                        "timestamp": _log_row_timestamp(entry),
+                        "level": entry["level"],
+                        "message": entry["message"]
+                    }
+                    for entry in pending
+                ])
+            await db.commit()
+        except BaseException:
+            # The rows went nowhere: queue them again ahead of anything logged since, for the next commit
+            if pending:
+                self._pending_logs[execution_id] = pending + self._pending_logs.get(execution_id, [])
+            # The snapshot can no longer be trusted to match the database
+            self._snapshots.pop(execution_id, None)
+            raise
+        _format_log_timestamps(pending)
+        # Every commit here is a status transition, so cached counts are stale
+        self.invalidate_system_status()
+        await self._update_snapshot(db, execution, pending, new_execution)
+    
+    async def _update_snapshot(
+        self, db: AsyncSession, execution: Execution, new_logs: List[Dict[str, Any]], new_execution: bool = False
+    ):
+        """Keep the status of an active execution in memory; drop it once the execution stops."""
+        if execution.status not in ACTIVE_EXECUTION_STATUSES:
+            self._snapshots.pop(execution.id, None)
+            return
+        
+        previous = self._snapshots.get(execution.id)
+        if previous is not None:
+            logs = previous.logs + new_logs
+        elif new_execution:
+            logs = new_logs
+        else:
+            # First snapshot of this run (or after a resume): read the logs written so far
+            logs = (await self._load_logs(db, [execution.id])).get(execution.id, [])
+        self._snapshots[execution.id] = self._execution_response(execution, logs)
+    
+    async def _load_logs(self, db: AsyncSession, execution_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Fetch execution_logs rows for the given executions, grouped and in write order."""
+        logs_by_execution: Dict[str, List[Dict[str, Any]]] = {}
+        if not execution_ids:
+            return logs_by_execution
+        rows = await db.scalars(LOGS_BY_EXECUTION_IDS_QUERY, {"execution_ids": execution_ids})
+        for row in rows:
+            logs_by_execution.setdefault(row.execution_id, []).append(row.to_dict())
+        return logs_by_execution
+    
+    async def _broadcast_logs(self):
+        """Send buffered log entries as one "multi" message per execution every interval.
+        
+        Exits once a tick finds nothing to send; the next buffered entry restarts it.
+        """
+        while True:
+            await asyncio.sleep(LOG_BROADCAST_INTERVAL)
+            pending, self._pending_log_broadcasts = self._pending_log_broadcasts, {}
+            if not pending:
+                return
+            for execution_id, entries in pending.items():
+                _format_log_timestamps(entries)
+                try:
+                    await self.websocket_manager.broadcast({
+                        "type": "multi",
+                        "execution_id": execution_id,
+                        "entries": entries
+                    }, subscription_filter="executions")
+                except Exception as e:
+                    logger.warning("Failed to broadcast logs for execution %s: %s", execution_id, e)
+    
+    async def start_task_execution(self, db: AsyncSession, request: TaskExecutionRequest) -> TaskExecutionResponse:
         """Start executing a task with specified agents - supports multi-agent execution."""
         
-        print(f"🎯 Starting task execution - Task: {request.task_id[:8]}... Work Dir: {request.work_directory}")
-        print(f"📊 Current running executions: {len(self.running_executions)}")
+        logger.debug("Starting task execution - Task: %s... Work Dir: %s", request.task_id[:8], request.work_directory)
+        logger.debug("Current running executions: %d", len(self.running_executions))
         
         # Get task from database
-        task = db.query(Task).filter(Task.id == request.task_id).first()
+        task = await db.scalar(
+            select(Task).where(Task.id == request.task_id).options(selectinload(Task.assigned_agents))
+        )
         if not task:
             raise ValueError(f"Task {request.task_id} not found")
         
@@ -53,62 +680,63 @@ class ExecutionEngine:
         if not agent_ids:
             raise ValueError("No agents assigned to task")
         
-        # Get agents from database
-        agents = db.query(Agent).filter(Agent.id.in_(agent_ids)).all()
-        if len(agents) != len(agent_ids):
-            missing = set(agent_ids) - {a.id for a in agents}
-            raise ValueError(f"Agents not found: {missing}")
-        
-        # Check if agents are busy (unless force restart)
+        # Check if agents are busy (unless force restart); answered from the status index
         if not request.force_restart:
-            busy_agents = []
-            for agent in agents:
-                if agent.status == AgentStatus.EXECUTING:
-                    busy_agents.append(agent.name)
+            busy_agents = (await db.scalars(BUSY_AGENT_NAMES_QUERY, {"agent_ids": agent_ids})).all()
             
             if busy_agents:
                 raise ValueError(f"Agents are busy: {busy_agents}. Use force_restart=true to override.")
         
-        # Create execution record for the primary agent (working approach)
-        import uuid
-        execution_id = str(uuid.uuid4())
+        # Only existence is checked here; the status change below is one bulk UPDATE
+        found_ids = set((await db.scalars(AGENT_IDS_QUERY, {"agent_ids": agent_ids})).all())
+        if len(found_ids) != len(agent_ids):
+            missing = set(agent_ids) - found_ids
+            raise ValueError(f"Agents not found: {missing}")
+        
+        execution_id = str(uuid7())  # Time-ordered, so new rows append to the primary key index
+        now = datetime.utcnow()  # One clock read for every timestamp of the start transition
+        
+        # Claim the agents with a conditional UPDATE. The check above can race another start;
+        # the row write can't, so of two concurrent starts only one flips an idle agent
+        claim = update(Agent).where(Agent.id.in_(agent_ids))
+        if not request.force_restart:
+            claim = claim.where(Agent.status != AgentStatus.EXECUTING)
+        claimed = await db.execute(claim.values(status=AgentStatus.EXECUTING, last_active=now))
+        if claimed.rowcount != len(agent_ids):
+            await db.rollback()
+            busy_agents = (await db.scalars(BUSY_AGENT_NAMES_QUERY, {"agent_ids": agent_ids})).all()
+            raise ValueError(f"Agents are busy: {busy_agents}. Use force_restart=true to override.")
         
+        # Create execution record for the primary agent (working approach)
         execution = Execution(
             id=execution_id,
             task_id=task.id,
-            agent_id=agents[0].id,  # Primary agent
+            agent_id=agent_ids[0],  # Primary agent
             status="starting",
-            start_time=datetime.utcnow(),
+            start_time=now,
             work_directory=request.work_directory,
-            logs=[{
-                "timestamp": datetime.utcnow().isoformat(),
-                "message": "Execution starting",
-                "level": "info"
-            }],
+            logs=[],
             output={},
             error_details={}
         )
         
         db.add(execution)
-        db.commit()
-        
-        # Update agent and task status
-        for agent in agents:
-            agent.status = AgentStatus.EXECUTING
-            agent.last_active = datetime.utcnow()
+        self._buffer_log(execution, "Execution starting")
+        # The execution row must exist before its participants and logs reference it
+        await db.flush()
+        await db.execute(insert(ExecutionAgent), [
+            {"execution_id": execution_id, "agent_id": agent_id, "role": "primary" if i == 0 else "collaborator"}
+            for i, agent_id in enumerate(agent_ids)
+        ])
         
-        # Update task status to in_progress
+        # Update task status to in_progress; committed together with the claim and execution rows
         task.status = TaskStatus.IN_PROGRESS
-        task.started_at = datetime.utcnow()
-        db.commit()
+        task.started_at = now
+        # One transaction for the whole start transition
+        await self._commit(db, execution, new_execution=True)
         
-        # Start execution task with timeout - use primary agent
-        print(f"🚀 Launching execution task {execution_id} for task {task.title}")
-        execution_task = asyncio.create_task(
-            self._execute_with_timeout(execution_id, task.id, agents[0].id, request.work_directory)
-        )
-        self.running_executions[execution_id] = execution_task
-        print(f"📈 Total running executions now: {len(self.running_executions)}")
+        logger.debug("Launching execution task %s for task %s", execution_id, task.title)
+        await self._launch(execution_id, task.id, list(agent_ids), request.work_directory)
         
         return TaskExecutionResponse(
             execution_id=execution_id,
@@ -118,162 +746,184 @@ class ExecutionEngine:
             started_at=execution.start_time
         )
     
-    async def _execute_with_timeout(self, execution_id: str, task_id: str, agent_id: str, work_dir: Optional[str] = None):
-        """Execute task with timeout protection."""
-        # Create new database session for this async task
-        from database import SessionLocal
-        db = SessionLocal()
+    async def _launch(self, execution_id: str, task_id: str, agent_ids: List[str], work_dir: Optional[str] = None):
+        """Run an execution in this process, or queue it for a Celery worker."""
+        if EXECUTION_BACKEND == "celery":
+            from tasks import run_agent_task  # Imported here because tasks imports this module
+            # The Celery task id is the execution id, so abort can revoke it
+            await asyncio.to_thread(
+                run_agent_task.apply_async, args=[execution_id, task_id, agent_ids, work_dir], task_id=execution_id
+            )
+            # The worker commits this execution's progress; a snapshot here would go stale
+            self._snapshots.pop(execution_id, None)
+            return
         
-        try:
-            # Get fresh objects from database
-            execution = db.query(Execution).filter(Execution.id == execution_id).first()
-            task = db.query(Task).filter(Task.id == task_id).first()
-            agent = db.query(Agent).filter(Agent.id == agent_id).first()
-            
-            if not execution or not task or not agent:
-                print(f"❌ Failed to retrieve objects: execution={execution}, task={task}, agent={agent}")
-                return
-            
-            execution.logs.append({
-                "timestamp": datetime.utcnow().isoformat(),
-                "message": f"_execute_with_timeout started for execution {execution_id[:8]}...",
-                "level": "info"
-            })
-            db.commit()
-            
-            agents = [agent]  # Convert to list for compatibility
+        self.running_executions[execution_id] = asyncio.create_task(
+            self._execute_with_timeout(execution_id, task_id, agent_ids, work_dir)
+        )
+        logger.debug("Total running executions now: %d", len(self.running_executions))
+    
+    async def run_execution(self, execution_id: str, task_id: str, agent_ids: List[str], work_dir: Optional[str] = None):
+        """Run a started execution to the end in this process; used by the Celery worker.
         
-            # Continue with existing timeout logic
-            await self._execute_timeout_logic(db, execution, task, agents, work_dir)
-            
-        except Exception as e:
-            if execution:
-                execution.logs.append({
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "message": f"Execution failed in _execute_with_timeout: {str(e)}",
-                    "level": "error"
-                })
-                execution.status = "failed"
-                execution.error_details = {"error": str(e)}
-                execution.end_time = datetime.utcnow()
-                db.commit()
-            print(f"❌ Error in _execute_with_timeout: {e}")
+        Executions that finished while queued (aborted, for instance) are skipped.
+        """
+        async with AsyncSessionLocal() as db:
+            status = await db.scalar(select(Execution.status).where(Execution.id == execution_id))
+        if status is None or status in FINISHED_EXECUTION_STATUSES:
+            return
+        
+        run = asyncio.create_task(self._execute_with_timeout(execution_id, task_id, agent_ids, work_dir))
+        self.running_executions[execution_id] = run
+        try:
+            await run
         finally:
-            db.close()
+            if self.running_executions.get(execution_id) is run:
+                del self.running_executions[execution_id]
     
-    async def _execute_timeout_logic(self, db: Session, execution: Execution, task: Task, agents: List[Agent], work_dir: Optional[str] = None):
+    async def _execute_with_timeout(self, execution_id: str, task_id: str, agent_ids: List[str], work_dir: Optional[str] = None):
+        """Execute task with timeout protection."""
+        # Recorded before waiting for a slot so a queued run can be stopped from elsewhere too
+        await self._set_run_owner(execution_id, True)
+        try:
+            await self._execute_in_slot(execution_id, task_id, agent_ids, work_dir)
+        finally:
+            await self._set_run_owner(execution_id, False)
+    
+    async def _execute_in_slot(self, execution_id: str, task_id: str, agent_ids: List[str], work_dir: Optional[str] = None):
+        # Hold a slot for the whole run; the timeout starts once one is free
+        async with _execution_slots():
+            # Create new database session for this async task
+            async with AsyncSessionLocal() as db:
+                execution = None
+                try:
+                    # Get fresh objects from database
+                    execution = await db.get(Execution, execution_id)
+                    task = await db.get(Task, task_id)
+                    agents = (await db.scalars(AGENTS_BY_IDS_QUERY, {"agent_ids": agent_ids})).all()
+                    
+                    if not execution or not task or len(agents) != len(agent_ids):
+                        logger.error("Failed to retrieve objects: execution=%s, task=%s, agents=%s", execution, task, agents)
+                        return
+                    
+                    # Keep the requested order; the first agent is the execution's primary agent
+                    agents_by_id = {agent.id: agent for agent in agents}
+                    agents = [agents_by_id[agent_id] for agent_id in agent_ids]
+                    
+                    self._buffer_log(execution, f"_execute_with_timeout started for execution {execution_id[:8]}...")
+                    
+                    # Continue with existing timeout logic
+                    await self._execute_timeout_logic(db, execution, task, agents, work_dir)
+                    
+                except Exception as e:
+                    if execution:
+                        self._buffer_log(execution, f"Execution failed in _execute_with_timeout: {str(e)}", level="error")
+                        execution.status = "failed"
+                        execution.error_details = {"error": str(e)}
+                        execution.end_time = datetime.utcnow()
+                        await self._commit(db, execution)
+                    logger.exception("Error in _execute_with_timeout for execution %s", execution_id)
+    
+    async def _execute_timeout_logic(self, db: AsyncSession, execution: Execution, task: Task, agents: List[Agent], work_dir: Optional[str] = None):
         """Original timeout logic extracted to separate method."""
         try:
             # Determine timeout
             # Parse estimated_duration (e.g., "2 hours", "30 minutes") or use default
             duration_seconds = self.DEFAULT_TIMEOUT
             if task.estimated_duration:
-                # Simple parsing - could be enhanced
-                if "hour" in task.estimated_duration.lower():
-                    try:
-                        hours = float(task.estimated_duration.split()[0])
-                        duration_seconds = hours * 3600
-                    except:
-                        pass
-                elif "minute" in task.estimated_duration.lower():
-                    try:
-                        minutes = float(task.estimated_duration.split()[0])
-                        duration_seconds = minutes * 60
-                    except:
-                        pass
+                duration_seconds = parse_duration(task.estimated_duration) or self.DEFAULT_TIMEOUT
             
             timeout = min(duration_seconds, self.MAX_TIMEOUT)
             
-            execution.logs.append({
-                "timestamp": datetime.utcnow().isoformat(),
-                "message": f"Starting execution with {timeout}s timeout",
-                "level": "info"
-            })
+            self._buffer_log(execution, f"Starting execution with {timeout}s timeout")
             execution.status = "running"
-            db.commit()
+            await self._commit(db, execution)
             
             # Execute with timeout
             try:
-                await asyncio.wait_for(
+                await _run_with_timeout(
                     self._execute_task_internal(db, execution, task, agents, work_dir),
-                    timeout=timeout
+                    timeout
                 )
             except asyncio.TimeoutError:
-                execution.logs.append({
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "message": f"Execution timed out after {timeout} seconds",
-                    "level": "error"
-                })
+                self._buffer_log(execution, f"Execution timed out after {timeout} seconds", level="error")
                 execution.status = "failed"
                 execution.error_details = {"error": "timeout", "timeout_seconds": timeout}
                 
         except Exception as e:
-            execution.logs.append({
-                "timestamp": datetime.utcnow().isoformat(),
-                "message": f"Execution failed: {str(e)}",
-                "level": "error"
-            })
+            self._buffer_log(execution, f"Execution failed: {str(e)}", level="error")
             execution.status = "failed"
             execution.error_details = {"error": str(e)}
         
         finally:
-            # Always clean up
-            execution.end_time = datetime.utcnow()
-            
-            # Release agents
-            for agent in agents:
-                agent.status = AgentStatus.IDLE
-                agent.last_active = datetime.utcnow()
+            # Always clean up; one clock read stamps the end and the released agents
+            now = datetime.utcnow()
+            execution.end_time = now
             
-            # Remove from running executions
-            if execution.id in self.running_executions:
-                del self.running_executions[execution.id]
-                print(f"🏁 Execution {execution.id} completed and removed from running list")
-                print(f"📉 Remaining running executions: {len(self.running_executions)}")
-            
-            db.commit()
+            try:
+                # Release agents in one statement
+                await db.execute(
+                    update(Agent)
+                    .where(Agent.id.in_([agent.id for agent in agents]))
+                    .values(status=AgentStatus.IDLE, last_active=now)
+                )
+                
+                # Final transition: result, logs and released agents land in one commit
+                await self._commit(db, execution)
+            except Exception:
+                await db.rollback()
+                logger.exception("Failed to record the outcome of execution %s", execution.id)
+            finally:
+                # Deregister even when the database write failed, unless a resume already registered a newer run
+                if self.running_executions.get(execution.id) is asyncio.current_task():
+                    del self.running_executions[execution.id]
+                    logger.debug("Execution %s completed and removed from running list", execution.id)
+                    logger.debug("Remaining running executions: %d", len(self.running_executions))
     
-    async def _execute_task_internal(self, db: Session, execution: Execution, task: Task, agents: List[Agent], work_dir: Optional[str] = None):
-        """Internal task execution with simplified approach."""
-        
-        primary_agent = agents[0]
+    async def _execute_task_internal(self, db: AsyncSession, execution: Execution, task: Task, agents: List[Agent], work_dir: Optional[str] = None):
+        """Internal task execution: one Claude CLI run per agent, run concurrently."""
         
         if not work_dir:
-            execution.logs.append({
-                "timestamp": datetime.utcnow().isoformat(),
-                "message": f"No work directory specified - task execution cannot proceed",
-                "level": "error"
-            })
-            db.commit()
+            self._buffer_log(execution, f"No work directory specified - task execution cannot proceed", level="error")
             raise ValueError("Work directory is required for task execution")
         
-        print(f"💼 Executing task '{task.title}' with agent '{primary_agent.name}' in directory: {work_dir}")
+        async def run_agent(agent: Agent) -> Dict[str, Any]:
+            # Agents get their own subdirectory so their CLAUDE.md files and edits don't collide
+            agent_dir = work_dir if len(agents) == 1 else str(Path(work_dir) / f"agent_{agent.id}")
+            async with _agent_slots():
+                logger.debug("Executing task '%s' with agent '%s' in directory: %s", task.title, agent.name, agent_dir)
+                # Execute with Claude CLI with 60 second timeout
+                return await self._execute_with_claude_sdk_timeout(db, execution, task, agent, agent_dir, timeout=60)
         
-        # Execute with Claude CLI with 60 second timeout
-        result = await self._execute_with_claude_sdk_timeout(db, execution, task, primary_agent, work_dir, timeout=60)
+        agent_runs = [asyncio.create_task(run_agent(agent)) for agent in agents]
+        try:
+            results = await asyncio.gather(*agent_runs)
+        except BaseException:
+            # One agent failed or the execution was cancelled: stop the others before propagating
+            for agent_run in agent_runs:
+                agent_run.cancel()
+            await asyncio.gather(*agent_runs, return_exceptions=True)
+            raise
         
         execution.status = "completed"
-        execution.output = result
+        if len(agents) == 1:
+            execution.output = results[0]
+        else:
+            execution.output = {agent.id: result for agent, result in zip(agents, results)}
         task.status = TaskStatus.COMPLETED
         task.completed_at = datetime.utcnow()
-        db.commit()
     
-    async def _execute_with_claude_sdk_timeout(self, db: Session, execution: Execution, task: Task, agent: Agent, work_dir: Optional[str], timeout: int = 60):
+    async def _execute_with_claude_sdk_timeout(self, db: AsyncSession, execution: Execution, task: Task, agent: Agent, work_dir: Optional[str], timeout: int = 60):
         """Execute with Claude Code CLI with structured JSON output."""
-        import subprocess
-        import json
-        import shutil
-        
         # Check if claude command is available
-        if not shutil.which("claude"):
+        if CLAUDE_BIN is None:
             raise Exception("Claude CLI not available - please install claude-code-cli")
         
         # Setup work directory
         if not work_dir:
-            work_dir = f"./claude_executions/execution_{execution.id}"
-        
-        work_path = Path(work_dir)
-        work_path.mkdir(parents=True, exist_ok=True)
+            work_path = EXECUTIONS_ROOT / f"execution_{execution.id}"
+        else:
+            work_path = Path(work_dir)
         
         # Create CLAUDE.md context file
         claude_md_content = f"""# {agent.name} Agent Context
@@ -293,10 +943,6 @@ class ExecutionEngine:
 {work_path}
 """
         
-        claude_md_path = work_path / "CLAUDE.md"
-        with open(claude_md_path, 'w') as f:
-            f.write(claude_md_content)
-        
         # JSON-structured task prompt
         task_prompt = f"""Please execute the following task autonomously:
 
@@ -319,65 +965,35 @@ Please provide your response in structured JSON format:
 
 Work efficiently and provide concrete deliverables."""
         
-        execution.logs.append({
-            "timestamp": datetime.utcnow().isoformat(),
-            "message": f"Starting Claude CLI execution (timeout: {timeout}s)",
-            "level": "info"
-        })
-        db.commit()
-        
-        # Claude Code CLI execution
-        claude_cmd = [
-            "claude", 
-            "--output-format", "json",
-            "--dangerously-skip-permissions",
-            "-p", task_prompt
-        ]
+        self._buffer_log(execution, f"Starting Claude CLI execution (timeout: {timeout}s)")
         
         try:
-            # Execute with timeout
-            result = await asyncio.wait_for(
-                asyncio.create_subprocess_exec(
-                    *claude_cmd,
-                    cwd=str(work_path),
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                ),
-                timeout=timeout
+            # Claude Code CLI execution on a pooled process started after CLAUDE.md is written;
+            # the timeout bounds getting one
+            response_data, response_text, stderr, returncode = await claude_pool.run(
+                str(work_path), claude_md_content, task_prompt, spawn_timeout=timeout,
+                on_event=lambda event: self._log_cli_event(execution, event),
+                # Per-execution default directories are never run again, so spares there would idle
+                keep_spares=bool(work_dir)
             )
             
-            stdout, stderr = await result.communicate()
-            
-            execution.logs.append({
-                "timestamp": datetime.utcnow().isoformat(),
-                "message": f"Claude CLI completed with return code: {result.returncode}",
-                "level": "info"
-            })
+            self._buffer_log(execution, f"Claude CLI completed with return code: {returncode}")
             
             if stderr:
-                execution.logs.append({
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "message": f"Claude CLI stderr: {stderr.decode()}",
-                    "level": "warning"
-                })
+                self._buffer_log(execution, f"Claude CLI stderr: {stderr.decode()}", level="warning")
             
-            db.commit()
-            
-            # Parse JSON response
-            response_text = stdout.decode().strip()
-            if response_text:
-                try:
-                    response_data = json.loads(response_text)
-                    return response_data
-                except json.JSONDecodeError:
-                    # Fallback to text response
-                    return {
-                        "analysis": "Task executed",
-                        "implementation": response_text,
-                        "results": "Completed with text output",
-                        "status": "completed",
-                        "needs_interaction": False
-                    }
+            # The CLI's final result message carries the response
+            if response_data is not None:
+                return response_data
+            elif response_text:
+                # Fallback to text response
+                return {
+                    "analysis": "Task executed",
+                    "implementation": response_text,
+                    "results": "Completed with text output",
+                    "status": "completed",
+                    "needs_interaction": False
+                }
             else:
                 return {
                     "analysis": "Task executed",
@@ -387,51 +1003,39 @@ Work efficiently and provide concrete deliverables."""
                 }
                 
         except asyncio.TimeoutError:
-            execution.logs.append({
-                "timestamp": datetime.utcnow().isoformat(),
-                "message": f"Claude CLI execution timed out after {timeout}s",
-                "level": "error"
-            })
-            db.commit()
+            self._buffer_log(execution, f"Claude CLI execution timed out after {timeout}s", level="error")
             raise
         except Exception as e:
-            execution.logs.append({
-                "timestamp": datetime.utcnow().isoformat(),
-                "message": f"Claude CLI error: {str(e)}",
-                "level": "error"
-            })
-            db.commit()
+            self._buffer_log(execution, f"Claude CLI error: {str(e)}", level="error")
             raise
     
-    async def _execute_with_expert_fallback(self, db: Session, execution: Execution, task: Task, agent: Agent):
+    def _log_cli_event(self, execution: Execution, event: Dict[str, Any]):
+        """Log the assistant's text and tool calls from a streamed CLI message as they arrive."""
+        if event.get("type") != "assistant":
+            return
+        for block in (event.get("message") or {}).get("content") or []:
+            if block.get("type") == "text" and block.get("text"):
+                self._buffer_log(execution, block["text"])
+            elif block.get("type") == "tool_use":
+                self._buffer_log(execution, f"Using tool: {block.get('name')}")
+    
+    async def _execute_with_expert_fallback(self, db: AsyncSession, execution: Execution, task: Task, agent: Agent):
         """Expert system fallback when Claude SDK fails."""
         
-        execution.logs.append({
-            "timestamp": datetime.utcnow().isoformat(),
-            "message": "Using expert system fallback",
-            "level": "info"
-        })
-        db.commit()
+        self._buffer_log(execution, "Using expert system fallback")
         
         # Simulate processing time
         await asyncio.sleep(2)
         
         # Generate expert response based on agent role
-        if "backend" in agent.role.lower():
-            response = f"Backend task '{task.title}' analyzed. Would implement API endpoints, database models, and error handling according to FastAPI best practices."
-        elif "frontend" in agent.role.lower():
-            response = f"Frontend task '{task.title}' analyzed. Would create React components with TypeScript, Chakra UI styling, and proper state management."
-        elif "test" in agent.role.lower():
-            response = f"Testing task '{task.title}' analyzed. Would create comprehensive test suites including unit tests, integration tests, and performance tests."
-        else:
-            response = f"Task '{task.title}' completed by {agent.name}. Applied {agent.role} expertise to fulfill requirements."
+        role = agent.role.lower()
+        template = next(
+            (template for keyword, template in self._ROLE_TEMPLATES if keyword in role),
+            self._DEFAULT_ROLE_TEMPLATE
+        )
+        response = template.format(title=task.title, name=agent.name, role=agent.role)
         
-        execution.logs.append({
-            "timestamp": datetime.utcnow().isoformat(),
-            "message": "Expert fallback completed",
-            "level": "info"
-        })
-        db.commit()
+        self._buffer_log(execution, "Expert fallback completed")
         
         return {
             "agent_response": response,
@@ -441,113 +1045,144 @@ Work efficiently and provide concrete deliverables."""
         }
     
     # Keep existing methods for compatibility
-    async def pause_execution(self, execution_id: str, db: Session) -> bool:
-        """Pause execution by cancelling task and saving state."""
-        if execution_id not in self.running_executions:
-            return False
+    async def _cancel_and_wait(self, execution_task: asyncio.Task, timeout: float = 5):
+        """Cancel a running execution and give it time to unwind.
         
-        # Cancel the running task
-        task = self.running_executions[execution_id]
-        task.cancel()
-        
-        # Update execution status
-        execution = db.query(Execution).filter(Execution.id == execution_id).first()
-        if execution:
-            execution.status = "paused"
-            execution.logs.append({
-                "timestamp": datetime.utcnow().isoformat(),
-                "message": "Execution paused by user",
-                "level": "info"
-            })
-            db.commit()
-        
-        # Move to paused executions
-        del self.running_executions[execution_id]
-        self.paused_executions[execution_id] = {"paused_at": datetime.utcnow().isoformat()}
-        
-        return True
+        Unwinding kills its Claude CLI process and commits its own cleanup, which
+        must land before the caller records the paused or cancelled status.
+        """
+        execution_task.cancel()
+        await asyncio.wait({execution_task}, timeout=timeout)
     
-    async def resume_execution(self, execution_id: str, db: Session) -> bool:
-        """Resume paused execution."""
-        if execution_id not in self.paused_executions:
-            return False
+    async def _release_participants(self, db: AsyncSession, execution: Execution, now: datetime):
+        """Set every agent taking part in an execution back to idle, in the caller's transaction.
         
-        execution = db.query(Execution).filter(Execution.id == execution_id).first()
-        if not execution:
-            return False
-        
-        # Get related task and agents
-        task = db.query(Task).filter(Task.id == execution.task_id).first()
-        agent = db.query(Agent).filter(Agent.id == execution.agent_id).first()
-        
-        if not task or not agent:
-            return False
-        
-        execution.logs.append({
-            "timestamp": datetime.utcnow().isoformat(),
-            "message": "Resuming execution",
-            "level": "info"
-        })
-        db.commit()
-        
-        # Restart execution
-        execution_task = asyncio.create_task(
-            self._execute_with_timeout(db, execution, task, [agent])
+        Executions from before execution_agents only record their primary agent.
+        """
+        participants = select(ExecutionAgent.agent_id).where(ExecutionAgent.execution_id == execution.id)
+        await db.execute(
+            update(Agent)
+            .where(or_(Agent.id.in_(participants), Agent.id == execution.agent_id))
+            .values(status=AgentStatus.IDLE, last_active=now)
         )
-        self.running_executions[execution_id] = execution_task
-        
-        # Remove from paused
-        del self.paused_executions[execution_id]
-        
-        return True
     
-    async def abort_execution(self, execution_id: str, db: Session) -> bool:
-        """Abort execution completely."""
-        
-        # Cancel if running
-        if execution_id in self.running_executions:
-            task = self.running_executions[execution_id]
-            task.cancel()
-            del self.running_executions[execution_id]
-        
-        # Remove if paused
-        if execution_id in self.paused_executions:
+    async def pause_execution(self, execution_id: str, db: AsyncSession) -> bool:
+        """Pause execution by cancelling task and saving state."""
+        async with self._control_lock:
+            execution_task = self.running_executions.pop(execution_id, None)
+            if execution_task is not None:
+                # Cancel the running task
+                await self._cancel_and_wait(execution_task)
+            elif self._state is None or not await self._cancel_remote_run(execution_id):
+                # Not running here, and no other process has claimed it
+                return False
+            
+            # Update execution status
+            execution = await db.get(Execution, execution_id)
+            if execution:
+                execution.status = "paused"
+                # A run still waiting for a slot never reached its own cleanup, so release here too
+                await self._release_participants(db, execution, datetime.utcnow())
+                self._buffer_log(execution, "Execution paused by user")
+                await self._commit(db, execution)
+            
+            # Move to paused executions
+            self.paused_executions[execution_id] = {"paused_at": datetime.utcnow().isoformat()}
+            
+            return True
+    
+    async def resume_execution(self, execution_id: str, db: AsyncSession) -> bool:
+        """Resume paused execution."""
+        async with self._control_lock:
+            if execution_id not in self.paused_executions:
+                return False
+            
+            execution = await db.get(Execution, execution_id)
+            if not execution:
+                return False
+            
+            # Get related task and agents
+            task = await db.get(Task, execution.task_id)
+            agent = await db.get(Agent, execution.agent_id)
+            
+            if not task or not agent:
+                return False
+            
+            # Primary agent first; executions from before execution_agents only have the primary
+            participant_ids = (await db.scalars(
+                select(ExecutionAgent.agent_id).where(ExecutionAgent.execution_id == execution_id)
+            )).all()
+            agent_ids = [agent.id] + [agent_id for agent_id in participant_ids if agent_id != agent.id]
+            
+            # Pausing released the agents; re-claim them with the same conditional UPDATE as
+            # start, so an agent another execution took in the meantime isn't shared
+            claimed = await db.execute(
+                update(Agent)
+                .where(Agent.id.in_(agent_ids), Agent.status != AgentStatus.EXECUTING)
+                .values(status=AgentStatus.EXECUTING, last_active=datetime.utcnow())
+            )
+            if claimed.rowcount != len(agent_ids):
+                await db.rollback()
+                busy_agents = (await db.scalars(BUSY_AGENT_NAMES_QUERY, {"agent_ids": agent_ids})).all()
+                raise ValueError(f"Agents are busy: {busy_agents}. Resume once they are free.")
+            
+            # The claim lands in the same commit as the log entry
+            self._buffer_log(execution, "Resuming execution")
+            await self._commit(db, execution)
+            
+            # Restart execution
+            await self._launch(execution.id, task.id, agent_ids, execution.work_directory)
+            
+            # Remove from paused
             del self.paused_executions[execution_id]
-        
-        # Update execution record
-        execution = db.query(Execution).filter(Execution.id == execution_id).first()
-        if execution:
-            execution.status = "cancelled"
-            execution.end_time = datetime.utcnow()
-            execution.logs.append({
-                "timestamp": datetime.utcnow().isoformat(),
-                "message": "Execution aborted by user",
-                "level": "info"
-            })
             
-            # Release agent and update task
-            if execution.agent_id:
-                agent = db.query(Agent).filter(Agent.id == execution.agent_id).first()
-                if agent:
-                    agent.status = AgentStatus.IDLE
-                    agent.last_active = datetime.utcnow()
+            return True
+    
+    async def abort_execution(self, execution_id: str, db: AsyncSession) -> bool:
+        """Abort execution completely."""
+        async with self._control_lock:
+            # Cancel if running
+            execution_task = self.running_executions.pop(execution_id, None)
+            if execution_task is not None:
+                await self._cancel_and_wait(execution_task)
+            elif self._state is not None:
+                # Another API replica or a Celery worker may be running it
+                await self._cancel_remote_run(execution_id)
+            elif EXECUTION_BACKEND == "celery":
+                from tasks import celery_app
+                # Runs on a worker; a job still queued skips itself once the execution is cancelled
+                await asyncio.to_thread(celery_app.control.revoke, execution_id, terminate=True)
             
-            # Update task status
-            if execution.task_id:
-                task = db.query(Task).filter(Task.id == execution.task_id).first()
-                if task:
-                    task.status = TaskStatus.CANCELLED
+            # Remove if paused
+            self.paused_executions.pop(execution_id, None)
             
-            db.commit()
-        
-        return True
+            # Update execution record
+            execution = await db.get(Execution, execution_id)
+            if execution:
+                now = datetime.utcnow()
+                execution.status = "cancelled"
+                execution.end_time = now
+                self._buffer_log(execution, "Execution aborted by user")
+                
+                # Release every participant in the same commit that marks the execution cancelled
+                await self._release_participants(db, execution, now)
+                
+                # Update task status
+                if execution.task_id:
+                    task = await db.get(Task, execution.task_id)
+                    if task:
+                        task.status = TaskStatus.CANCELLED
+                
+                await self._commit(db, execution)
+            
+            return True
     
-    def get_execution_status(self, execution_id: str, db: Session) -> Optional[ExecutionResponse]:
-        """Get current execution status."""
-        execution = db.query(Execution).filter(Execution.id == execution_id).first()
-        if not execution:
-            return None
+    @staticmethod
+    def _execution_response(execution, log_rows: List[Dict[str, Any]]) -> ExecutionResponse:
+        """Build the API response from an Execution or a row of EXECUTION_COLUMNS.
         
+        execution_logs rows follow any legacy entries in the JSON logs column.
+        """
         # Handle cases where output might be a list or other non-dict type
         output = execution.output or {}
         if isinstance(output, list):
@@ -569,7 +1204,7 @@ Work efficiently and provide concrete deliverables."""
             status=execution.status,
             start_time=execution.start_time,
             end_time=execution.end_time,
-            logs=execution.logs or [],
+            logs=(execution.logs or []) + log_rows,
             output=output,
             error_details=execution.error_details or {},
             duration_seconds=str((execution.end_time - execution.start_time).total_seconds()) if execution.end_time else None,
@@ -580,63 +1215,64 @@ Work efficiently and provide concrete deliverables."""
             needs_interaction=execution.needs_interaction or False
         )
     
-    def get_all_executions(self, db: Session) -> List[ExecutionResponse]:
-        """Get all executions."""
-        executions = db.query(Execution).all()
+    async def get_execution_status(self, execution_id: str, db: AsyncSession) -> Optional[ExecutionResponse]:
+        """Get current execution status."""
+        # Polls of active executions are answered from memory; it matches their last commit
+        snapshot = self._snapshots.get(execution_id)
+        if snapshot is not None:
+            return snapshot
+        
+        execution = await db.get(Execution, execution_id)
+        if not execution:
+            return None
+        
+        logs_by_execution = await self._load_logs(db, [execution_id])
+        return self._execution_response(execution, logs_by_execution.get(execution_id, []))
+    
+    async def get_all_executions(
+        self, db: AsyncSession, skip: int = 0, limit: int = 100, include_logs: bool = True
+    ) -> List[ExecutionResponse]:
+        """Get a page of executions, newest first.
+        
+        With include_logs=False the log column and log rows are not read and every logs list is empty.
+        """
+        # Plain rows of the response columns; no ORM objects or relationships are loaded
+        rows = (await db.execute(
+            select(*(EXECUTION_COLUMNS if include_logs else EXECUTION_SUMMARY_COLUMNS))
+            .order_by(Execution.start_time.desc(), Execution.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )).all()
+        # Logs of the whole page in one query
+        logs_by_execution = await self._load_logs(db, [row.id for row in rows]) if include_logs else {}
         result = []
         
-        for execution in executions:
+        for row in rows:
             try:
-                # Handle cases where output might be a list or other non-dict type
-                output = execution.output or {}
-                if isinstance(output, list):
-                    # Convert list to dict format
-                    output = {"messages": output}
-                elif not isinstance(output, dict):
-                    # Convert other types to dict
-                    output = {"data": str(output)}
-                
-                # Handle agent_response similarly
-                agent_response = execution.agent_response or {}
-                if not isinstance(agent_response, dict):
-                    agent_response = {"response": str(agent_response)}
-                
-                result.append(ExecutionResponse(
-                    id=execution.id,
-                    task_id=execution.task_id,
-                    agent_id=execution.agent_id,
-                    status=execution.status,
-                    start_time=execution.start_time,
-                    end_time=execution.end_time,
-                    logs=execution.logs or [],
-                    output=output,
-                    error_details=execution.error_details or {},
-                    duration_seconds=str((execution.end_time - execution.start_time).total_seconds()) if execution.end_time else None,
-                    memory_usage={},
-                    api_calls_made=[],
-                    agent_response=agent_response,
-                    work_directory=execution.work_directory,
-                    needs_interaction=execution.needs_interaction or False
-                ))
+                result.append(self._execution_response(row, logs_by_execution.get(row.id, [])))
             except Exception as e:
-                print(f"Error processing execution {execution.id}: {e}")
+                logger.warning("Error processing execution %s: %s", row.id, e)
                 # Skip problematic execution records
                 continue
         
         return result
     
-    def get_system_status(self, db: Session) -> SystemStatus:
+    def invalidate_system_status(self):
+        """Drop the cached system status; call after committing changes to agents or tasks."""
+        self._system_status_generation += 1
+        self._system_status_cache = None
+    
+    async def get_system_status(self, db: AsyncSession) -> SystemStatus:
         """Get overall system status."""
-        total_agents = db.query(Agent).count()
-        active_agents = db.query(Agent).filter(Agent.status == AgentStatus.EXECUTING).count()
-        total_tasks = db.query(Task).count()
-        pending_tasks = db.query(Task).filter(Task.status == TaskStatus.PENDING).count()
-        running_tasks = db.query(Task).filter(Task.status == TaskStatus.IN_PROGRESS).count()
-        completed_tasks = db.query(Task).filter(Task.status == TaskStatus.COMPLETED).count()
-        failed_tasks = db.query(Task).filter(Task.status == TaskStatus.FAILED).count()
-        running_executions = len(self.running_executions)
-        
-        return SystemStatus(
+        cached = self._system_status_cache
+        generation = self._system_status_generation
+        if cached and cached[1] == generation and time.monotonic() - cached[0] < SYSTEM_STATUS_TTL_SECONDS:
+            return cached[2]
+        
+        (total_agents, active_agents, total_tasks,
+         pending_tasks, running_tasks, completed_tasks, failed_tasks) = (await db.execute(SYSTEM_COUNTS_QUERY)).one()
+        
+        status = SystemStatus(
             total_agents=total_agents,
             active_agents=active_agents,
             total_tasks=total_tasks,
@@ -648,6 +1284,10 @@ Work efficiently and provide concrete deliverables."""
             memory_usage={},
             last_updated=datetime.utcnow()
         )
+        # A change committed while the counts were read leaves them unfit to cache
+        if generation == self._system_status_generation:
+            self._system_status_cache = (time.monotonic(), generation, status)
+        return status
 
 # Global instance
 execution_engine = ExecutionEngine()
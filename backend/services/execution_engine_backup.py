@@ -1,23 +1,236 @@
 """
 Asynchronous execution engine for multi-agent task processing.
+
+Kept alongside services.execution_engine, which is the engine the API runs.
+The staged init/execute/finalize pipeline (ExecutionJob and its queues) exists
+only in this module.
 """
 
 import asyncio
 import json
+import logging
+import socket
 import time
+import orjson
+from collections import Counter
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 from pathlib import Path
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import and_, or_, bindparam, func, insert, select, tuple_, update
 
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from models import Agent, Task, Execution, AgentStatus, TaskStatus
+from database import AsyncSessionLocal, async_engine, STATE_CHANGE_CHANNEL
+from models import Agent, Task, Execution, ExecutionLog, AgentStatus, TaskStatus
 from schemas import TaskExecutionRequest, ExecutionResponse, SystemStatus, TaskExecutionResponse
 
+# Resolved once at import; spawns check the flag instead of retrying a missing import
+try:
+    from claude_code_sdk import query, ClaudeCodeOptions
+    CLAUDE_SDK_AVAILABLE = True
+except ImportError:
+    CLAUDE_SDK_AVAILABLE = False
+
+# Dashboards poll the status endpoint; answers younger than this are served from memory
+SYSTEM_STATUS_TTL_SECONDS = 2.0
+
+# Execution pipeline sizing: workers per stage and the bound on each stage queue
+PIPELINE_INIT_WORKERS = 2
+PIPELINE_EXEC_WORKERS = int(os.getenv("EXECUTION_WORKERS", "4"))
+PIPELINE_FINAL_WORKERS = 2
+PIPELINE_QUEUE_SIZE = 100
+
+# Upper bound on Claude Code sessions in flight at once, across all executions
+AGENT_MAX_CONCURRENCY = int(os.getenv("AGENT_MAX_CONCURRENCY", "20"))
+
+# "local" runs executions on the in-process pipeline; "celery" hands them to tasks.run_agent_task
+EXECUTION_BACKEND = os.getenv("EXECUTION_BACKEND", "local")
+
+# When set, engines publish WebSocket events to this Redis channel instead of sending
+# them inline; each API process relays the channel to its own clients (relay_events)
+EVENTS_REDIS_URL = os.getenv("EVENTS_REDIS_URL")
+EVENTS_CHANNEL = os.getenv("EVENTS_CHANNEL", "exec_events")
+
+# When set, runs are recorded in Redis hashes (exec:<id>) and stop requests go out on
+# exec_ctl:<id>, so any API replica can stop an execution another replica is running
+STATE_REDIS_URL = os.getenv("STATE_REDIS_URL")
+
+# Event payloads carry naive UTC datetimes; orjson writes them as ISO 8601 with a Z suffix
+EVENT_JSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+
+logger = logging.getLogger(__name__)
+
+# Statements are built once at import and bound per call, so their cache keys are
+# stable and warm_statement_cache() can compile them before the first request
+TASK_BY_ID_QUERY = select(Task).where(Task.id == bindparam("task_id"))
+TASK_WITH_AGENTS_QUERY = TASK_BY_ID_QUERY.options(selectinload(Task.assigned_agents))
+AGENTS_BY_IDS_QUERY = select(Agent).where(Agent.id.in_(bindparam("agent_ids", expanding=True)))
+LOGS_BY_EXECUTION_IDS_QUERY = (
+    select(ExecutionLog)
+    .where(ExecutionLog.execution_id.in_(bindparam("execution_ids", expanding=True)))
+    .order_by(ExecutionLog.execution_id, ExecutionLog.timestamp, ExecutionLog.id)
+)
+
+# One scan per table; each bucket is a COUNT(*) FILTER (WHERE ...) column
+AGENT_COUNTS_QUERY = select(
+    func.count(),
+    func.count().filter(Agent.status == AgentStatus.EXECUTING)
+).select_from(Agent)
+TASK_COUNTS_QUERY = select(
+    func.count(),
+    *(func.count().filter(Task.status == status) for status in (
+        TaskStatus.PENDING, TaskStatus.IN_PROGRESS, TaskStatus.COMPLETED, TaskStatus.FAILED
+    ))
+).select_from(Task)
+
+# Columns behind an execution summary; ExecutionResponse defaults cover the rest
+EXECUTION_SUMMARY_QUERY = (
+    select(
+        Execution.id,
+        Execution.task_id,
+        Execution.agent_id,
+        Execution.status,
+        Execution.start_time,
+        Execution.end_time,
+        Execution.duration_seconds
+    )
+    .order_by(Execution.start_time.desc(), Execution.id.desc())
+)
+
+
+async def warm_statement_cache():
+    """Run each module-level statement once so the engine's compiled cache is hot.
+    
+    The parameters match nothing; only the compilation is wanted.
+    """
+    async with async_engine.connect() as conn:
+        await conn.execute(TASK_WITH_AGENTS_QUERY, {"task_id": ""})
+        await conn.execute(AGENTS_BY_IDS_QUERY, {"agent_ids": [""]})
+        await conn.execute(LOGS_BY_EXECUTION_IDS_QUERY, {"execution_ids": [""]})
+        await conn.execute(AGENT_COUNTS_QUERY)
+        await conn.execute(TASK_COUNTS_QUERY)
+        await conn.execute(EXECUTION_SUMMARY_QUERY.limit(1))
+
+
+# dataclass(slots=True) needs Python 3.10; on 3.9 these classes fall back to a __dict__
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_SLOTS)
+class ExecutionJob:
+    """An execution travelling through the init -> execute -> finalize pipeline."""
+    execution_id: str
+    task_id: str
+    agent_ids: List[str]
+    work_directory: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[BaseException] = None
+
+
+@dataclass(**_SLOTS)
+class SynthesisContext:
+    """What the primary agent receives when merging collaborator output."""
+    task_id: str
+    original_task: Dict[str, Any]
+    plan: Dict[str, Any]
+    subtask_results: Dict[str, Any]
+    phase: str = "synthesis"
+
+
+@dataclass(**_SLOTS)
+class LogEntry:
+    """A queued execution log line; becomes one execution_logs row on flush."""
+    timestamp_ns: int  # time.time_ns() when the entry was added
+    message: str
+    level: str = "info"
+    agent_id: Optional[str] = None
+    details: Dict[str, Any] = field(default_factory=dict)
+
+
+class _LogBuffer:
+    """Collects execution log entries and writes them to execution_logs in one INSERT on flush."""
+    
+    def __init__(self, execution: Execution):
+        self.execution = execution
+        self.entries: List[LogEntry] = []
+    
+    def add(self, message: str, level: str = "info", agent_id: Optional[str] = None, **details):
+        """Queue a log entry, stamped now; it is converted to a datetime when the buffer is flushed."""
+        self.entries.append(LogEntry(time.time_ns(), message, level, agent_id, details))
+    
+    async def flush(self, db: AsyncSession, commit: bool = False):
+        """Insert queued entries into execution_logs.
+        
+        Entries are sent in one executemany INSERT inside the current transaction;
+        pass commit=True at phase boundaries that other readers must observe.
+        """
+        # Flush first so a new execution row (and its generated id) exists before its logs
+        await db.flush()
+        
+        if self.entries:
+            execution_id = self.execution.id
+            # Append-only rows: the executions row is never rewritten for a new log line
+            await db.execute(insert(ExecutionLog), [
+                {
+                    "execution_id": execution_id,
+                    "timestamp": datetime.utcfromtimestamp(entry.timestamp_ns // 1_000 / 1_000_000),
+                    "message": entry.message,
+                    "level": entry.level,
+                    "agent_id": entry.agent_id,
+                    "details": entry.details
+                }
+                for entry in self.entries
+            ])
+            self.entries = []
+        
+        if commit:
+            await db.commit()
+
+
+class BroadcastBatcher:
+    """Coalesces WebSocket events sent in quick succession into a single frame.
+    
+    Events queued within `interval` seconds (or until `max_events` are waiting)
+    go out together as {"type": "batch", "events": [...]}; a lone event is sent
+    unwrapped so existing clients keep working.
+    """
+    
+    def __init__(self, broadcast: Callable[[Dict[str, Any]], Awaitable[Any]], interval: float = 0.02, max_events: int = 8):
+        self._broadcast = broadcast
+        self.interval = interval
+        self.max_events = max_events
+        self._events: List[Dict[str, Any]] = []
+        self._timer: Optional[asyncio.Task] = None
+    
+    async def enqueue(self, event: Dict[str, Any]):
+        """Queue an event, sending the batch straight away once it is full."""
+        self._events.append(event)
+        if len(self._events) >= self.max_events:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+    
+    async def _flush_later(self):
+        await asyncio.sleep(self.interval)
+        self._timer = None
+        await self.flush()
+    
+    async def flush(self):
+        """Send everything queued so far as one frame."""
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+            self._timer = None
+        
+        events, self._events = self._events, []
+        if not events:
+            return
+        await self._broadcast(events[0] if len(events) == 1 else {"type": "batch", "events": events})
+
 
 class ExecutionEngine:
     """Manages asynchronous execution of tasks by agents."""
@@ -27,63 +240,152 @@ class ExecutionEngine:
         self.paused_executions: Dict[str, Dict[str, Any]] = {}  # execution_id -> state
         self.agent_instances: Dict[str, Any] = {}  # Placeholder for agent instances
         self.websocket_manager = None  # Will be injected
-        
+        self._batcher: Optional[BroadcastBatcher] = None  # Wraps websocket_manager.broadcast once injected
+        self._agent_display_cache: Dict[str, Dict[str, Any]] = {}  # agent_id -> joined profile strings
+        self._system_status_cache: Optional[Tuple[float, SystemStatus]] = None  # (monotonic time, status)
+        self._status_counts: Optional[Counter] = None  # (table, status name) -> rows, while listening for changes
+        self._log_buffers: Dict[str, _LogBuffer] = {}  # execution_id -> logs pending the next phase commit
+        
+        # init -> execute -> finalize pipeline; queues and workers start on first use
+        self._init_q: Optional[asyncio.Queue] = None
+        self._exec_q: Optional[asyncio.Queue] = None
+        self._final_q: Optional[asyncio.Queue] = None
+        self._pipeline_workers: List[asyncio.Task] = []
+        
+        # Held for the duration of each SDK query so bursts don't overrun provider quotas
+        self._agent_slots = asyncio.Semaphore(AGENT_MAX_CONCURRENCY)
+        
+        self._redis = None
+        if EVENTS_REDIS_URL:
+            from redis import asyncio as redis_asyncio
+            self._redis = redis_asyncio.from_url(EVENTS_REDIS_URL)
+            # Publishing is one round trip however many clients are connected,
+            # and works from Celery workers that have no WebSocket manager
+            self._batcher = BroadcastBatcher(self._publish_event)
+        
+        self._state = None
+        self._control_listener: Optional[asyncio.Task] = None
+        if STATE_REDIS_URL:
+            from redis import asyncio as redis_asyncio
+            self._state = redis_asyncio.from_url(STATE_REDIS_URL, decode_responses=True)
+    
     def set_websocket_manager(self, websocket_manager: Any):
         """Inject WebSocket manager for real-time updates."""
         self.websocket_manager = websocket_manager
+        if self._redis is None:
+            self._batcher = BroadcastBatcher(websocket_manager.broadcast) if websocket_manager else None
+    
+    async def _publish_event(self, event: Dict[str, Any]):
+        await self._redis.publish(EVENTS_CHANNEL, orjson.dumps(event, option=EVENT_JSON_OPTIONS))
+    
+    async def relay_events(self):
+        """Forward events from the Redis channel to this process's WebSocket clients.
+        
+        Run as a background task for the lifetime of the API process; a no-op
+        unless EVENTS_REDIS_URL is set.
+        """
+        if self._redis is None:
+            return
+        
+        async with self._redis.pubsub() as pubsub:
+            await pubsub.subscribe(EVENTS_CHANNEL)
+            async for message in pubsub.listen():
+                if message["type"] != "message" or not self.websocket_manager:
+                    continue
+                try:
+                    await self.websocket_manager.broadcast(orjson.loads(message["data"]))
+                except Exception as e:
+                    logger.warning("Failed to relay execution event: %s", e)
+    
+    def _log_buffer(self, execution: Execution) -> _LogBuffer:
+        """Return the shared log buffer for an execution, flushed at its phase boundaries."""
+        log_buffer = self._log_buffers.get(execution.id)
+        if log_buffer is None or log_buffer.execution is not execution:
+            log_buffer = self._log_buffers[execution.id] = _LogBuffer(execution)
+        return log_buffer
+    
+    def _agent_display(self, agent: Agent) -> Dict[str, Any]:
+        """Return cached display strings for an agent's capabilities, constraints and objectives."""
+        cached = self._agent_display_cache.get(agent.id)
+        # Entries are stamped with updated_at so an edited agent is re-joined on next use
+        if cached is None or cached["updated_at"] != agent.updated_at:
+            cached = {
+                "updated_at": agent.updated_at,
+                "caps3": ', '.join(agent.top_capabilities),
+                "constraints": ', '.join(agent.constraints),
+                "objectives": ', '.join(agent.objectives)
+            }
+            self._agent_display_cache[agent.id] = cached
+        return cached
     
-    async def start_task_execution(self, db: Session, request: TaskExecutionRequest) -> TaskExecutionResponse:
+    async def start_task_execution(self, db: AsyncSession, request: TaskExecutionRequest) -> TaskExecutionResponse:
         """Start executing a task with specified agents."""
         
-        # Get task from database
-        task = db.query(Task).filter(Task.id == request.task_id).first()
+        # Get task from database; its assigned agents are only needed when none were requested
+        task = await db.scalar(
+            TASK_BY_ID_QUERY if request.agent_ids else TASK_WITH_AGENTS_QUERY,
+            {"task_id": request.task_id}
+        )
         if not task:
             raise ValueError(f"Task {request.task_id} not found")
         
         # Determine which agents to use
-        agent_ids = request.agent_ids or [agent.id for agent in task.assigned_agents]
-        if not agent_ids:
+        if request.agent_ids:
+            agents = await self._load_agents(db, request.agent_ids)
+        else:
+            agents = list(task.assigned_agents)
+        if not agents:
             raise ValueError("No agents assigned to task")
         
-        # Get agents from database
-        agents = db.query(Agent).filter(Agent.id.in_(agent_ids)).all()
-        if len(agents) != len(agent_ids):
-            raise ValueError("Some specified agents not found")
-        
         # Check if agents are available
-        busy_agents = [agent for agent in agents if agent.status == AgentStatus.EXECUTING]
+        if len(agents) == 1:
+            busy_agents = agents if agents[0].status == AgentStatus.EXECUTING else []
+        else:
+            busy_agents = [agent for agent in agents if agent.status == AgentStatus.EXECUTING]
         if busy_agents and not request.force_restart:
             busy_names = [agent.name for agent in busy_agents]
             raise ValueError(f"Agents are busy: {busy_names}. Use force_restart=true to override.")
         
         # Create execution record
+        now = datetime.utcnow()
         execution = Execution(
             task_id=task.id,
             agent_id=agents[0].id,  # Primary agent
             status="starting",
-            start_time=datetime.utcnow(),
-            logs=[{"timestamp": datetime.utcnow().isoformat(), "message": "Execution starting", "level": "info"}]
+            start_time=now
         )
         db.add(execution)
-        db.commit()
-        db.refresh(execution)
+        
+        log_buffer = _LogBuffer(execution)
+        log_buffer.add("Execution starting")
         
         # Update task status
         task.status = TaskStatus.IN_PROGRESS
-        task.started_at = datetime.utcnow()
-        db.commit()
-        
-        # Update agent statuses
-        for agent in agents:
-            agent.status = AgentStatus.EXECUTING
-            agent.last_active = datetime.utcnow()
-        db.commit()
-        
-        # Start asynchronous execution
-        execution_task = asyncio.create_task(
-            self._execute_task_async(db, execution.id, task, agents, request.work_directory)
-        )
-        self.running_executions[execution.id] = execution_task
+        task.started_at = now
+        
+        # Update agent statuses: the loaded agent directly in the common single-agent
+        # case, otherwise a single UPDATE ... WHERE id IN (...)
+        if len(agents) == 1:
+            agents[0].status = AgentStatus.EXECUTING
+            agents[0].last_active = now
+        else:
+            await db.execute(
+                update(Agent)
+                .where(Agent.id.in_([agent.id for agent in agents]))
+                .values(status=AgentStatus.EXECUTING, last_active=now)
+            )
+        
+        # Execution insert, first log row, task and agent updates land in one transaction
+        await log_buffer.flush(db, commit=True)
+        
+        # Hand off to the pipeline; each stage opens its own session because this
+        # request's session is closed as soon as the response is sent
+        await self._submit(ExecutionJob(
+            execution_id=execution.id,
+            task_id=task.id,
+            agent_ids=[agent.id for agent in agents],
+            work_directory=request.work_directory
+        ))
         
         return TaskExecutionResponse(
             execution_id=execution.id,
@@ -93,129 +395,343 @@ class ExecutionEngine:
             started_at=execution.start_time
         )
     
-    async def _execute_task_async(self, db: Session, execution_id: str, task: Task, agents: List[Agent], work_directory: str = None):
-        """Execute task asynchronously with multiple agents."""
+    async def _load_agents(self, db: AsyncSession, agent_ids: List[str]) -> List[Agent]:
+        """Load agents by id, keeping the order of agent_ids (the first is the primary agent).
+        
+        Raises ValueError if any of them does not exist.
+        """
+        if len(agent_ids) == 1:
+            # Primary-key lookup; answered from the identity map if already loaded
+            agent = await db.get(Agent, agent_ids[0])
+            if agent is None:
+                raise ValueError("Some specified agents not found")
+            return [agent]
+        
+        agents_by_id = {
+            agent.id: agent
+            for agent in await db.scalars(AGENTS_BY_IDS_QUERY, {"agent_ids": agent_ids})
+        }
+        if len(agents_by_id) != len(set(agent_ids)):
+            raise ValueError("Some specified agents not found")
+        return [agents_by_id[agent_id] for agent_id in agent_ids]
+    
+    async def _submit(self, job: ExecutionJob, resumed: bool = False):
+        """Hand a job to the Celery worker or to the in-process pipeline."""
+        if EXECUTION_BACKEND == "celery":
+            from tasks import run_agent_task  # Imported here because tasks imports this module
+            # The Celery task id is the execution id, so stop paths can revoke it directly
+            await asyncio.to_thread(
+                run_agent_task.apply_async,
+                args=[job.execution_id, job.task_id, job.agent_ids, job.work_directory],
+                task_id=job.execution_id
+            )
+            return
+        
+        self._ensure_pipeline()
+        # A resumed execution is already "running", so it goes straight to the execute stage
+        await (self._exec_q if resumed else self._init_q).put(job)
+    
+    def _ensure_pipeline(self):
+        """Create the stage queues and start their worker pools on first use."""
+        if self._pipeline_workers:
+            return
+        
+        self._init_q = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        self._exec_q = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        self._final_q = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        
+        for stage, queue, next_queue, workers in (
+            (self._init_stage, self._init_q, self._exec_q, PIPELINE_INIT_WORKERS),
+            (self._execute_stage, self._exec_q, self._final_q, PIPELINE_EXEC_WORKERS),
+            (self._finalize_stage, self._final_q, None, PIPELINE_FINAL_WORKERS)
+        ):
+            for _ in range(workers):
+                self._pipeline_workers.append(asyncio.create_task(self._pipeline_worker(stage, queue, next_queue)))
+        
+        if self._state is not None:
+            self._control_listener = asyncio.create_task(self._listen_for_control())
+    
+    async def _listen_for_control(self):
+        """Cancel local runs when any replica asks for them to be stopped."""
+        async with self._state.pubsub() as pubsub:
+            await pubsub.psubscribe("exec_ctl:*")
+            async for message in pubsub.listen():
+                if message["type"] != "pmessage" or message["data"] != "cancel":
+                    continue
+                run = self.running_executions.get(message["channel"].split(":", 1)[1])
+                if run is not None:
+                    run.cancel()
+    
+    async def _pipeline_worker(self, stage: Callable[[ExecutionJob], Awaitable[bool]], queue: asyncio.Queue, next_queue: Optional[asyncio.Queue]):
+        """Feed jobs from one stage queue to its stage handler, passing survivors to the next queue."""
+        while True:
+            job = await queue.get()
+            try:
+                if await stage(job) and next_queue is not None:
+                    await next_queue.put(job)
+            except Exception:
+                logger.exception("Pipeline stage %s failed for execution %s", stage.__name__, job.execution_id)
+            finally:
+                queue.task_done()
+    
+    async def run_job(self, job: ExecutionJob):
+        """Take a job through every stage in this coroutine, bypassing the in-process queues.
+        
+        Used by the Celery worker, which already gives each execution its own process slot.
+        """
+        for stage in (self._init_stage, self._execute_stage, self._finalize_stage):
+            if not await stage(job):
+                return
+    
+    async def _init_stage(self, job: ExecutionJob) -> bool:
+        """Mark the execution running; returns False if the job should be dropped."""
+        try:
+            async with AsyncSessionLocal() as db:
+                # Claim the execution with a conditional UPDATE so a cancel that
+                # lands while the job is queued is never overwritten
+                claimed = await db.execute(
+                    update(Execution)
+                    .where(Execution.id == job.execution_id, Execution.status == "starting")
+                    .values(status="running")
+                )
+                if claimed.rowcount == 0:
+                    return False  # Cancelled or aborted while queued
+                
+                execution = await db.get(Execution, job.execution_id)
+                agents = await self._load_agents(db, job.agent_ids)
+                
+                # Initialize agent instances if needed
+                for agent in agents:
+                    if agent.id not in self.agent_instances:
+                        # Placeholder for agent wrapper - will be implemented with actual MCP integration
+                        self.agent_instances[agent.id] = {
+                            "agent": agent,
+                            "capabilities_top3": agent.top_capabilities,
+                            "initialized": True,
+                            "status": "ready"
+                        }
+                
+                log_buffer = _LogBuffer(execution)
+                log_buffer.add(f"Starting task execution with agents: {[a.name for a in agents]}")
+                await log_buffer.flush(db, commit=True)
+        except Exception as e:
+            # Skip the run and let finalize record the failure
+            job.error = e
+            return True
+        
+        # Broadcast execution update
+        if self._batcher:
+            await self._batcher.enqueue({
+                "type": "execution_update",
+                "execution_id": job.execution_id,
+                "status": "running",
+                "message": "Task execution in progress",
+                "timestamp": datetime.utcnow()
+            })
         
-        execution = db.query(Execution).filter(Execution.id == execution_id).first()
+        return True
+    
+    async def _execute_stage(self, job: ExecutionJob) -> bool:
+        """Run the agents for a job, keeping the outcome on the job for finalize.
         
+        The run itself is a separate task registered in running_executions so
+        cancel, pause and abort can stop it without taking down the worker.
+        """
+        if job.error is not None:
+            return True
+        
+        run = self._track_run(job.execution_id, self._run_agents(job))
         try:
-            # Initialize agent instances if needed
-            for agent in agents:
-                if agent.id not in self.agent_instances:
-                    # Placeholder for agent wrapper - will be implemented with actual MCP integration
-                    self.agent_instances[agent.id] = {
-                        "agent": agent,
-                        "initialized": True,
-                        "status": "ready"
-                    }
+            if self._state is not None:
+                await self._state.hset(f"exec:{job.execution_id}", mapping={
+                    "worker": socket.gethostname(),
+                    "pid": os.getpid(),
+                    "status": "running"
+                })
+            # wait() rather than await so a cancelled run does not cancel this worker
+            await asyncio.wait({run})
+        finally:
+            self._log_buffers.pop(job.execution_id, None)
+            if self._state is not None:
+                await self._state.delete(f"exec:{job.execution_id}")
+        
+        if run.cancelled():
+            return False  # cancel/pause/abort already recorded the new state
+        if run.exception() is not None:
+            job.error = run.exception()
+        elif run.result() is None:
+            return False  # Stopped before the run started
+        else:
+            job.result = run.result()
+        
+        return True
+    
+    def _track_run(self, execution_id: str, coro: Awaitable[Any]) -> asyncio.Task:
+        """Start an agent run and register it in running_executions until it finishes.
+        
+        Entries remove themselves from a done callback, so no exit path can leave a
+        finished task behind. The dict holds strong references on purpose: the event
+        loop only keeps weak ones, so a weakly held task could be collected mid-run.
+        """
+        run = asyncio.create_task(coro, name=f"exec-{execution_id}")
+        self.running_executions[execution_id] = run
+        
+        def _untrack(finished: asyncio.Task):
+            # A resumed run may already have taken this id over
+            if self.running_executions.get(execution_id) is finished:
+                del self.running_executions[execution_id]
+        
+        run.add_done_callback(_untrack)
+        return run
+    
+    async def _cancel_run(self, execution_id: str):
+        """Cancel the agent run for an execution, if any, and wait for it to unwind."""
+        if EXECUTION_BACKEND == "celery":
+            from tasks import celery_app
+            await asyncio.to_thread(celery_app.control.revoke, execution_id, terminate=True)
+            return
+        
+        run = self.running_executions.get(execution_id)
+        if run is None:
+            if self._state is not None:
+                await self._cancel_remote_run(execution_id)
+            return
+        run.cancel()
+        # wait() lets the run finish its cleanup without re-raising its outcome here
+        await asyncio.wait({run})
+    
+    async def _cancel_remote_run(self, execution_id: str, timeout: float = 5.0):
+        """Ask the replica running an execution to cancel it, waiting briefly for it to unwind."""
+        key = f"exec:{execution_id}"
+        if not await self._state.exists(key):
+            return
+        
+        await self._state.publish(f"exec_ctl:{execution_id}", "cancel")
+        # The owner deletes the key once its run has unwound
+        deadline = time.monotonic() + timeout
+        while await self._state.exists(key) and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+    
+    async def _run_agents(self, job: ExecutionJob) -> Optional[Dict[str, Any]]:
+        """Execute the task with its agents in a session of its own."""
+        async with AsyncSessionLocal() as db:
+            execution = await db.get(Execution, job.execution_id)
+            if execution.status != "running":
+                return None
             
-            # Update execution status
-            execution.status = "running"
-            execution.logs.append({
-                "timestamp": datetime.utcnow().isoformat(),
-                "message": f"Starting task execution with agents: {[a.name for a in agents]}",
-                "level": "info"
-            })
-            db.commit()
+            task = await db.get(Task, job.task_id)
+            agents = await self._load_agents(db, job.agent_ids)
+            log_buffer = self._log_buffer(execution)
             
-            # Broadcast execution update
-            if self.websocket_manager:
-                await self.websocket_manager.broadcast({
-                    "type": "execution_update",
-                    "execution_id": execution_id,
-                    "status": "running",
-                    "message": "Task execution in progress",
-                    "timestamp": datetime.utcnow().isoformat()
-                })
+            try:
+                # Execute task based on number of agents
+                if len(agents) == 1:
+                    # Single agent execution
+                    result = await self._execute_single_agent(agents[0], task, execution, db, job.work_directory)
+                else:
+                    # Multi-agent collaboration
+                    result = await self._execute_multi_agent(agents, task, execution, db, job.work_directory)
+            except Exception:
+                await log_buffer.flush(db, commit=True)
+                raise
             
-            # Execute task based on number of agents
-            if len(agents) == 1:
-                # Single agent execution
-                result = await self._execute_single_agent(agents[0], task, execution, db, work_directory)
-            else:
-                # Multi-agent collaboration
-                result = await self._execute_multi_agent(agents, task, execution, db, work_directory)
+            # Execution-done boundary: persist what the agents logged
+            await log_buffer.flush(db, commit=True)
+            return result
+    
+    async def _finalize_stage(self, job: ExecutionJob) -> bool:
+        """Record the job's result or error on the task, execution and agents."""
+        async with AsyncSessionLocal() as db:
+            execution = await db.get(Execution, job.execution_id)
+            if not execution:
+                return False
             
-            # Update task and execution with results
-            task.status = TaskStatus.COMPLETED
-            task.completed_at = datetime.utcnow()
-            task.results = result
+            result = job.result
+            end_time = datetime.utcnow()
             
-            execution.status = "completed"
-            execution.end_time = datetime.utcnow()
-            execution.output = result
-            execution.duration_seconds = str((execution.end_time - execution.start_time).total_seconds())
+            if job.error is None:
+                # Update execution with results
+                values = {
+                    "status": "completed",
+                    "end_time": end_time,
+                    "output": result,
+                    "duration_seconds": str((end_time - execution.start_time).total_seconds())
+                }
+                
+                # Save agent response and interaction status
+                if isinstance(result, dict) and 'agent_response' in result:
+                    values["agent_response"] = result['agent_response']
+                    values["needs_interaction"] = result.get('needs_interaction', False)
+                    values["work_directory"] = result.get('work_directory')
+            else:
+                # Handle execution error
+                error_message = str(job.error)
+                values = {
+                    "status": "failed",
+                    "end_time": end_time,
+                    "error_details": {"error": error_message, "type": type(job.error).__name__}
+                }
             
-            # Save agent response and interaction status
-            if isinstance(result, dict) and 'agent_response' in result:
-                execution.agent_response = result['agent_response']
-                execution.needs_interaction = result.get('needs_interaction', False)
-                execution.work_directory = result.get('work_directory')
+            # Only finish executions that are still live; a user stop wins the race
+            finished = await db.execute(
+                update(Execution)
+                .where(Execution.id == job.execution_id, Execution.status.in_(("starting", "running")))
+                .values(**values)
+            )
+            if finished.rowcount == 0:
+                return False  # Stopped by the user in the meantime
             
-            execution.logs.append({
-                "timestamp": datetime.utcnow().isoformat(),
-                "message": "Task execution completed successfully",
-                "level": "info"
-            })
+            task = await db.get(Task, job.task_id)
+            log_buffer = _LogBuffer(execution)
             
-            # Update agent statuses
-            for agent in agents:
-                agent.status = AgentStatus.IDLE
-                agent.last_active = datetime.utcnow()
+            if job.error is None:
+                task.status = TaskStatus.COMPLETED
+                task.completed_at = end_time
+                task.results = result
+                log_buffer.add("Task execution completed successfully")
+                agent_status = AgentStatus.IDLE
+            else:
+                task.status = TaskStatus.FAILED
+                task.error_message = error_message
+                log_buffer.add(f"Task execution failed: {error_message}", level="error")
+                agent_status = AgentStatus.ERROR
             
-            db.commit()
+            # Update agent statuses
+            await db.execute(
+                update(Agent)
+                .where(Agent.id.in_(job.agent_ids))
+                .values(status=agent_status, last_active=end_time)
+            )
             
-            # Broadcast completion
-            if self.websocket_manager:
-                await self.websocket_manager.broadcast({
+            await log_buffer.flush(db, commit=True)
+        
+        if self._batcher:
+            if job.error is None:
+                # Broadcast completion
+                await self._batcher.enqueue({
                     "type": "execution_completed",
-                    "execution_id": execution_id,
-                    "task_id": task.id,
+                    "execution_id": job.execution_id,
+                    "task_id": job.task_id,
                     "result": result,
-                    "timestamp": datetime.utcnow().isoformat()
+                    "timestamp": datetime.utcnow()
                 })
-        
-        except Exception as e:
-            # Handle execution error
-            error_message = str(e)
-            
-            task.status = TaskStatus.FAILED
-            task.error_message = error_message
-            
-            execution.status = "failed"
-            execution.end_time = datetime.utcnow()
-            execution.error_details = {"error": error_message, "type": type(e).__name__}
-            execution.logs.append({
-                "timestamp": datetime.utcnow().isoformat(),
-                "message": f"Task execution failed: {error_message}",
-                "level": "error"
-            })
-            
-            # Reset agent statuses
-            for agent in agents:
-                agent.status = AgentStatus.ERROR
-                agent.last_active = datetime.utcnow()
-            
-            db.commit()
-            
-            # Broadcast error
-            if self.websocket_manager:
-                await self.websocket_manager.broadcast({
+            else:
+                # Broadcast error
+                await self._batcher.enqueue({
                     "type": "execution_failed",
-                    "execution_id": execution_id,
-                    "task_id": task.id,
+                    "execution_id": job.execution_id,
+                    "task_id": job.task_id,
                     "error": error_message,
-                    "timestamp": datetime.utcnow().isoformat()
+                    "timestamp": datetime.utcnow()
                 })
+            # Final state goes out now rather than waiting for the batch window
+            await self._batcher.flush()
         
-        finally:
-            # Clean up
-            if execution_id in self.running_executions:
-                del self.running_executions[execution_id]
+        return True
     
-    async def cancel_execution(self, db: Session, execution_id: str):
+    async def cancel_execution(self, db: AsyncSession, execution_id: str):
         """Cancel a running execution."""
-        execution = db.query(Execution).filter(Execution.id == execution_id).first()
+        execution = await db.get(Execution, execution_id)
         if not execution:
             raise ValueError(f"Execution {execution_id} not found")
         
@@ -223,52 +739,47 @@ class ExecutionEngine:
             raise ValueError(f"Cannot cancel execution with status: {execution.status}")
         
         # Cancel the asyncio task if it exists
-        if execution_id in self.running_executions:
-            task = self.running_executions[execution_id]
-            task.cancel()
-            try:
-                await task
-            except asyncio.CancelledError:
-                pass
-            del self.running_executions[execution_id]
+        await self._cancel_run(execution_id)
         
         # Update execution status
         execution.status = "cancelled"
         execution.end_time = datetime.utcnow()
-        execution.logs.append({
-            "timestamp": datetime.utcnow().isoformat(),
-            "message": "Execution cancelled by user",
-            "level": "warning"
-        })
+        log_buffer = _LogBuffer(execution)
+        log_buffer.add("Execution cancelled by user", level="warning")
         
         # Update task status
-        task = db.query(Task).filter(Task.id == execution.task_id).first()
+        task = await db.get(Task, execution.task_id)
         if task:
             task.status = TaskStatus.CANCELLED
             task.error_message = "Execution cancelled"
         
         # Update agent status
-        agent = db.query(Agent).filter(Agent.id == execution.agent_id).first()
-        if agent:
-            agent.status = AgentStatus.IDLE
-            agent.last_active = datetime.utcnow()
+        await db.execute(
+            update(Agent)
+            .where(Agent.id == execution.agent_id)
+            .values(status=AgentStatus.IDLE, last_active=datetime.utcnow())
+        )
         
-        db.commit()
+        await log_buffer.flush(db, commit=True)
         
         # Broadcast cancellation
-        if self.websocket_manager:
-            await self.websocket_manager.broadcast({
+        if self._batcher:
+            await self._batcher.enqueue({
                 "type": "execution_cancelled",
                 "execution_id": execution_id,
                 "message": "Execution cancelled by user",
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": datetime.utcnow()
             })
+            await self._batcher.flush()
         
         return {"status": "cancelled", "execution_id": execution_id}
     
-    async def pause_execution(self, db: Session, execution_id: str):
+    async def pause_execution(self, db: AsyncSession, execution_id: str):
         """Pause a running execution."""
-        execution = db.query(Execution).filter(Execution.id == execution_id).first()
+        if EXECUTION_BACKEND == "celery":
+            raise ValueError("Pause and resume need the in-process pipeline; they are not available with EXECUTION_BACKEND=celery")
+        
+        execution = await db.get(Execution, execution_id)
         if not execution:
             raise ValueError(f"Execution {execution_id} not found")
         
@@ -286,44 +797,40 @@ class ExecutionEngine:
         }
         
         # Cancel the running task
-        if execution_id in self.running_executions:
-            task = self.running_executions[execution_id]
-            task.cancel()
-            try:
-                await task
-            except asyncio.CancelledError:
-                pass
-            del self.running_executions[execution_id]
+        await self._cancel_run(execution_id)
         
         # Update execution status
         execution.status = "paused"
-        execution.logs.append({
-            "timestamp": datetime.utcnow().isoformat(),
-            "message": "Execution paused by user",
-            "level": "info"
-        })
+        log_buffer = _LogBuffer(execution)
+        log_buffer.add("Execution paused by user")
         
         # Update agent status
-        agent = db.query(Agent).filter(Agent.id == execution.agent_id).first()
-        if agent:
-            agent.status = AgentStatus.IDLE
+        await db.execute(
+            update(Agent)
+            .where(Agent.id == execution.agent_id)
+            .values(status=AgentStatus.IDLE)
+        )
         
-        db.commit()
+        await log_buffer.flush(db, commit=True)
         
         # Broadcast pause event
-        if self.websocket_manager:
-            await self.websocket_manager.broadcast({
+        if self._batcher:
+            await self._batcher.enqueue({
                 "type": "execution_paused",
                 "execution_id": execution_id,
                 "message": "Execution paused by user",
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": datetime.utcnow()
             })
+            await self._batcher.flush()
         
         return {"status": "paused", "execution_id": execution_id}
     
-    async def resume_execution(self, db: Session, execution_id: str):
+    async def resume_execution(self, db: AsyncSession, execution_id: str):
         """Resume a paused execution."""
-        execution = db.query(Execution).filter(Execution.id == execution_id).first()
+        if EXECUTION_BACKEND == "celery":
+            raise ValueError("Pause and resume need the in-process pipeline; they are not available with EXECUTION_BACKEND=celery")
+        
+        execution = await db.get(Execution, execution_id)
         if not execution:
             raise ValueError(f"Execution {execution_id} not found")
         
@@ -338,41 +845,44 @@ class ExecutionEngine:
         
         # Update execution status
         execution.status = "running"
-        execution.logs.append({
-            "timestamp": datetime.utcnow().isoformat(),
-            "message": "Execution resumed by user",
-            "level": "info"
-        })
+        log_buffer = _LogBuffer(execution)
+        log_buffer.add("Execution resumed by user")
         
         # Update agent status
-        agent = db.query(Agent).filter(Agent.id == execution.agent_id).first()
-        if agent:
-            agent.status = AgentStatus.EXECUTING
+        await db.execute(
+            update(Agent)
+            .where(Agent.id == execution.agent_id)
+            .values(status=AgentStatus.EXECUTING)
+        )
         
-        db.commit()
+        await log_buffer.flush(db, commit=True)
         
         # Remove from paused executions
         del self.paused_executions[execution_id]
         
         # Create new execution task
-        task = db.query(Task).filter(Task.id == execution.task_id).first()
-        execution_task = asyncio.create_task(self._execute_task(agent, task, execution, db))
-        self.running_executions[execution_id] = execution_task
+        await self._submit(ExecutionJob(
+            execution_id=execution_id,
+            task_id=execution.task_id,
+            agent_ids=[execution.agent_id],
+            work_directory=execution.work_directory
+        ), resumed=True)
         
         # Broadcast resume event
-        if self.websocket_manager:
-            await self.websocket_manager.broadcast({
+        if self._batcher:
+            await self._batcher.enqueue({
                 "type": "execution_resumed",
                 "execution_id": execution_id,
                 "message": "Execution resumed by user",
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": datetime.utcnow()
             })
+            await self._batcher.flush()
         
         return {"status": "resumed", "execution_id": execution_id}
     
-    async def abort_execution(self, db: Session, execution_id: str):
+    async def abort_execution(self, db: AsyncSession, execution_id: str):
         """Abort an execution (cannot be resumed)."""
-        execution = db.query(Execution).filter(Execution.id == execution_id).first()
+        execution = await db.get(Execution, execution_id)
         if not execution:
             raise ValueError(f"Execution {execution_id} not found")
         
@@ -380,14 +890,7 @@ class ExecutionEngine:
             raise ValueError(f"Cannot abort execution with status: {execution.status}")
         
         # Cancel the asyncio task if running
-        if execution_id in self.running_executions:
-            task = self.running_executions[execution_id]
-            task.cancel()
-            try:
-                await task
-            except asyncio.CancelledError:
-                pass
-            del self.running_executions[execution_id]
+        await self._cancel_run(execution_id)
         
         # Remove from paused executions if exists
         if execution_id in self.paused_executions:
@@ -396,42 +899,40 @@ class ExecutionEngine:
         # Update execution status
         execution.status = "aborted"
         execution.end_time = datetime.utcnow()
-        execution.logs.append({
-            "timestamp": datetime.utcnow().isoformat(),
-            "message": "Execution aborted by user",
-            "level": "warning"
-        })
+        log_buffer = _LogBuffer(execution)
+        log_buffer.add("Execution aborted by user", level="warning")
         
         # Update task status
-        task = db.query(Task).filter(Task.id == execution.task_id).first()
+        task = await db.get(Task, execution.task_id)
         if task:
             task.status = TaskStatus.FAILED
             task.error_message = "Execution aborted by user"
         
         # Update agent status
-        agent = db.query(Agent).filter(Agent.id == execution.agent_id).first()
-        if agent:
-            agent.status = AgentStatus.IDLE
+        await db.execute(
+            update(Agent)
+            .where(Agent.id == execution.agent_id)
+            .values(status=AgentStatus.IDLE)
+        )
         
-        db.commit()
+        await log_buffer.flush(db, commit=True)
         
         # Broadcast abort event
-        if self.websocket_manager:
-            await self.websocket_manager.broadcast({
+        if self._batcher:
+            await self._batcher.enqueue({
                 "type": "execution_aborted",
                 "execution_id": execution_id,
                 "message": "Execution aborted by user",
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": datetime.utcnow()
             })
+            await self._batcher.flush()
         
         return {"status": "aborted", "execution_id": execution_id}
     
-    async def _spawn_claude_code_agent(self, agent: Agent, task: Task, execution: Execution, db: Session, work_dir: str = None) -> Dict[str, Any]:
+    async def _spawn_claude_code_agent(self, agent: Agent, task: Task, execution: Execution, db: AsyncSession, work_dir: str = None) -> Dict[str, Any]:
         """Spawn Claude Code instance using Python SDK for non-interactive execution."""
-        import os
-        import json
-        from pathlib import Path
-        from claude_code_sdk import query, ClaudeCodeOptions
+        if not CLAUDE_SDK_AVAILABLE:
+            raise RuntimeError("claude_code_sdk is not installed; install it to run Claude Code agents")
         
         # Use user-configurable work directory or create default
         if not work_dir:
@@ -467,6 +968,8 @@ class ExecutionEngine:
         claude_md_path = work_path / "CLAUDE.md"
         claude_md_path.write_text(claude_md_content)
         
+        log_buffer = self._log_buffer(execution)
+        
         # Create task prompt optimized for Claude Code Python SDK
         task_prompt = f"""You are {agent.name}, a {agent.role}.
 
@@ -496,64 +999,58 @@ Work within your capabilities and provide expert-level output. Respond with ONLY
         
         try:
             # Log Claude Code SDK execution start
-            execution.logs.append({
-                "timestamp": datetime.utcnow().isoformat(),
-                "message": f"Starting Claude Code SDK execution for {agent.name}",
-                "level": "info",
-                "details": f"Work directory: {work_dir}, Context file: {claude_md_path}"
-            })
-            db.commit()
+            log_buffer.add(
+                f"Starting Claude Code SDK execution for {agent.name}",
+                details=f"Work directory: {work_dir}, Context file: {claude_md_path}"
+            )
             
             # Execute using Claude Code Python SDK
             messages = []
             assistant_messages = []
             final_response = ""
             
+            # Held outside the loop so it can be closed on every exit; an abandoned
+            # generator would keep the SDK's CLI process running until garbage collection
+            sdk_stream = query(
+                prompt=task_prompt,
+                options=ClaudeCodeOptions(
+                    max_turns=3,  # Reduce turns to avoid SDK JSON issues
+                    cwd=str(work_path),
+                    permission_mode="bypassPermissions",  # Critical for non-interactive
+                    system_prompt=f"You are {agent.name}, a {agent.role}. " + agent.system_prompt
+                )
+            )
             try:
-                async for message in query(
-                    prompt=task_prompt,
-                    options=ClaudeCodeOptions(
-                        max_turns=3,  # Reduce turns to avoid SDK JSON issues
-                        cwd=str(work_path),
-                        permission_mode="bypassPermissions",  # Critical for non-interactive
-                        system_prompt=f"You are {agent.name}, a {agent.role}. " + agent.system_prompt
-                    )
-                ):
-                    messages.append(message)
-                    msg_type = type(message).__name__
-                    
-                    # Handle different message types properly
-                    if msg_type == "AssistantMessage" and hasattr(message, 'content'):
-                        if message.content:
-                            for block in message.content:
-                                # Handle text blocks
-                                if hasattr(block, 'text'):
-                                    assistant_messages.append(block.text)
-                                # Handle tool use blocks  
-                                elif hasattr(block, 'input'):
-                                    assistant_messages.append(str(block.input))
-                    
-                    # Log progress with proper message type handling
-                    execution.logs.append({
-                        "timestamp": datetime.utcnow().isoformat(),
-                        "message": f"Received {msg_type} from Claude Code SDK",
-                        "level": "info"
-                    })
-                    db.commit()
-                    
+                async with self._agent_slots:
+                    async for message in sdk_stream:
+                        messages.append(message)
+                        msg_type = type(message).__name__
+                        
+                        # Handle different message types properly
+                        if msg_type == "AssistantMessage" and hasattr(message, 'content'):
+                            if message.content:
+                                for block in message.content:
+                                    # Handle text blocks
+                                    if hasattr(block, 'text'):
+                                        assistant_messages.append(block.text)
+                                    # Handle tool use blocks  
+                                    elif hasattr(block, 'input'):
+                                        assistant_messages.append(str(block.input))
+                        
+                        # Log progress with proper message type handling
+                        log_buffer.add(f"Received {msg_type} from Claude Code SDK")
+                        
             except Exception as sdk_error:
                 # Handle SDK JSON decode errors gracefully
                 error_msg = str(sdk_error)
-                execution.logs.append({
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "message": f"Claude Code SDK error: {error_msg}",
-                    "level": "warning"
-                })
-                db.commit()
+                log_buffer.add(f"Claude Code SDK error: {error_msg}", level="warning")
                 
                 # If we have some messages, continue with what we got
                 if not messages:
                     raise sdk_error  # Re-raise if no messages received
+            finally:
+                # Shielded so a second cancellation can't interrupt the SDK's cleanup
+                await asyncio.shield(sdk_stream.aclose())
             
             # Extract final response from AssistantMessages (already properly processed)
             if assistant_messages:
@@ -561,12 +1058,7 @@ Work within your capabilities and provide expert-level output. Respond with ONLY
                 final_response = "\n\n".join(str(msg) for msg in assistant_messages if msg)
             
             # Log completion
-            execution.logs.append({
-                "timestamp": datetime.utcnow().isoformat(),
-                "message": f"Claude Code SDK execution completed with {len(messages)} messages",
-                "level": "info"
-            })
-            db.commit()
+            log_buffer.add(f"Claude Code SDK execution completed with {len(messages)} messages")
             
             # Try to extract JSON from response or create structured response
             response_data = {}
@@ -584,11 +1076,7 @@ Work within your capabilities and provide expert-level output. Respond with ONLY
                         response_data = json.loads(json_str)
                         
                         # Log successful JSON parsing
-                        execution.logs.append({
-                            "timestamp": datetime.utcnow().isoformat(),
-                            "message": f"Successfully parsed JSON response with keys: {list(response_data.keys())}",
-                            "level": "info"
-                        })
+                        log_buffer.add(f"Successfully parsed JSON response with keys: {list(response_data.keys())}")
                     else:
                         # No JSON found, create structured response from text
                         response_data = {
@@ -604,12 +1092,7 @@ Work within your capabilities and provide expert-level output. Respond with ONLY
                         
                 except json.JSONDecodeError as e:
                     # JSON parsing failed, create structured response with raw content
-                    execution.logs.append({
-                        "timestamp": datetime.utcnow().isoformat(),
-                        "message": f"JSON parsing failed: {str(e)}, using raw response",
-                        "level": "warning"
-                    })
-                    db.commit()
+                    log_buffer.add(f"JSON parsing failed: {str(e)}, using raw response", level="warning")
                     
                     response_data = {
                         "analysis": "Claude Code SDK execution completed",
@@ -639,12 +1122,7 @@ Work within your capabilities and provide expert-level output. Respond with ONLY
                     "output_files": self._detect_output_files(work_path)
                 }
                 
-                execution.logs.append({
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "message": "No final response text extracted, using message count summary",
-                    "level": "warning"
-                })
-                db.commit()
+                log_buffer.add("No final response text extracted, using message count summary", level="warning")
                 
                 # Save response to output file
                 output_file = work_path / "claude_output.json"
@@ -664,25 +1142,17 @@ Work within your capabilities and provide expert-level output. Respond with ONLY
                     "needs_interaction": False,
                     "output_files": []
                 }
-                execution.logs.append({
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "message": "Claude Code SDK response was empty/invalid, using expert fallback",
-                    "level": "warning"
-                })
-                db.commit()
+                log_buffer.add("Claude Code SDK response was empty/invalid, using expert fallback", level="warning")
             
             # Check if agent needs user interaction
             needs_interaction = response_data.get("needs_interaction", False) or response_data.get("status") == "needs_user_input"
             
             # Log successful response
-            execution.logs.append({
-                "timestamp": datetime.utcnow().isoformat(),
-                "message": f"Received response from {agent.name} ({len(final_response)} characters)",
-                "level": "info",
-                "agent_status": response_data.get("status", "completed"),
-                "needs_interaction": response_data.get("needs_interaction", False)
-            })
-            db.commit()
+            log_buffer.add(
+                f"Received response from {agent.name} ({len(final_response)} characters)",
+                agent_status=response_data.get("status", "completed"),
+                needs_interaction=response_data.get("needs_interaction", False)
+            )
             
             return {
                 "status": response_data.get("status", "completed"),
@@ -705,12 +1175,7 @@ Work within your capabilities and provide expert-level output. Respond with ONLY
             
         except Exception as e:
             # Log execution error
-            execution.logs.append({
-                "timestamp": datetime.utcnow().isoformat(),
-                "message": f"Claude Code spawning failed: {str(e)}",
-                "level": "error"
-            })
-            db.commit()
+            log_buffer.add(f"Claude Code spawning failed: {str(e)}", level="error")
             
             # Generate fallback response
             fallback_response = self._generate_expert_fallback(agent, task)
@@ -743,12 +1208,7 @@ Work within your capabilities and provide expert-level output. Respond with ONLY
             
         finally:
             # Keep work directory for user inspection, just log its location
-            execution.logs.append({
-                "timestamp": datetime.utcnow().isoformat(),
-                "message": f"Work directory preserved at: {work_dir}",
-                "level": "info"
-            })
-            db.commit()
+            log_buffer.add(f"Work directory preserved at: {work_dir}")
     
     def _generate_expert_fallback(self, agent: Agent, task: Task) -> str:
         """Generate expert-level fallback response when Claude Code fails."""
@@ -762,6 +1222,8 @@ Work within your capabilities and provide expert-level output. Respond with ONLY
             "coordinator": "As a project coordinator, I'll organize this task:"
         }.get(agent.role.lower().split()[0], f"As a {agent.role}, I'll address this task:")
         
+        display = self._agent_display(agent)
+        
         return f"""{role_specific_intro}
 
 **Task Analysis**: {task.title}
@@ -770,7 +1232,7 @@ Work within your capabilities and provide expert-level output. Respond with ONLY
 {task.description}
 
 **Implementation Strategy**:
-Based on my capabilities in {', '.join(agent.capabilities[:3])}, I would:
+Based on my capabilities in {display['caps3']}, I would:
 
 1. **Initial Assessment**: Review the requirements and constraints
 2. **Methodology**: Apply domain expertise to develop solution approach  
@@ -782,7 +1244,7 @@ Based on my capabilities in {', '.join(agent.capabilities[:3])}, I would:
 {task.expected_output or 'Task completed according to specifications'}
 
 **Expert Recommendation**:
-This task requires {agent.role} expertise. I recommend proceeding with careful attention to {', '.join(agent.constraints)} while leveraging {', '.join(agent.objectives)}.
+This task requires {agent.role} expertise. I recommend proceeding with careful attention to {display['constraints']} while leveraging {display['objectives']}.
 
 **Status**: Task analysis completed. Ready for implementation phase with appropriate Claude Code integration.
 
@@ -792,40 +1254,29 @@ This task requires {agent.role} expertise. I recommend proceeding with careful a
     def _detect_output_files(self, work_path: Path) -> List[str]:
         """Detect files created in the work directory during execution."""
         try:
-            output_files = []
-            for file_path in work_path.glob("*"):
-                if file_path.is_file() and file_path.name != "CLAUDE.md":
-                    output_files.append(str(file_path.relative_to(work_path)))
-            return output_files
-        except Exception:
+            # scandir yields DirEntry objects with cached type info, so no extra stat per file
+            with os.scandir(work_path) as entries:
+                return [
+                    entry.name for entry in entries
+                    if entry.name != "CLAUDE.md" and entry.is_file(follow_symlinks=False)
+                ]
+        except OSError:
             return []
     
-    async def _execute_single_agent(self, agent: Agent, task: Task, execution: Execution, db: Session, work_dir: str = None) -> Dict[str, Any]:
+    async def _execute_single_agent(self, agent: Agent, task: Task, execution: Execution, db: AsyncSession, work_dir: str = None) -> Dict[str, Any]:
         """Execute task with a single agent using Claude Code spawning."""
         
-        agent_instance = self.agent_instances[agent.id]
+        log_buffer = self._log_buffer(execution)
         
         # Log agent initialization
-        execution.logs.append({
-            "timestamp": datetime.utcnow().isoformat(),
-            "message": f"Initializing Claude Code instance for agent {agent.name}",
-            "level": "info",
-            "agent_id": agent.id
-        })
-        db.commit()
+        log_buffer.add(f"Initializing Claude Code instance for agent {agent.name}", agent_id=agent.id)
         
         try:
             # Execute task with real Claude Code spawning
             result = await self._spawn_claude_code_agent(agent, task, execution, db, work_dir)
             
             # Log completion
-            execution.logs.append({
-                "timestamp": datetime.utcnow().isoformat(),
-                "message": f"Agent {agent.name} completed task successfully",
-                "level": "info",
-                "agent_id": agent.id
-            })
-            db.commit()
+            log_buffer.add(f"Agent {agent.name} completed task successfully", agent_id=agent.id)
             
             return {
                 "primary_agent": agent.name,
@@ -836,166 +1287,146 @@ This task requires {agent.role} expertise. I recommend proceeding with careful a
             
         except Exception as e:
             # Log error
-            execution.logs.append({
-                "timestamp": datetime.utcnow().isoformat(),
-                "message": f"Agent {agent.name} execution failed: {str(e)}",
-                "level": "error",
-                "agent_id": agent.id
-            })
-            db.commit()
+            log_buffer.add(f"Agent {agent.name} execution failed: {str(e)}", level="error", agent_id=agent.id)
             raise
     
-    async def _execute_multi_agent(self, agents: List[Agent], task: Task, execution: Execution, db: Session, work_directory: str = None) -> Dict[str, Any]:
+    async def _execute_subtask(self, agent: Agent, subtask: Any, execution: Execution, db: AsyncSession, work_directory: str = None) -> Dict[str, Any]:
+        """Execute a single subtask for a collaborating agent with its own Claude Code spawn."""
+        subtask_task = Task(
+            id=f"{execution.task_id}_subtask_{agent.id}",
+            title=f"Subtask for {agent.name}",
+            description=str(subtask)
+        )
+        
+        # Concurrent spawns each get a subdirectory so their context files don't collide
+        base_dir = work_directory or f"./claude_executions/execution_{execution.id}"
+        result = await self._spawn_claude_code_agent(
+            agent, subtask_task, execution, db, str(Path(base_dir) / f"subtask_{agent.id}")
+        )
+        
+        return {
+            "status": result["status"],
+            "subtask": subtask,
+            "agent": agent.name,
+            "output": result["agent_response"],
+            "capabilities_used": self.agent_instances[agent.id]["capabilities_top3"][:2]
+        }
+    
+    async def _execute_multi_agent(self, agents: List[Agent], task: Task, execution: Execution, db: AsyncSession, work_directory: str = None) -> Dict[str, Any]:
         """Execute task with multiple agents collaborating."""
         
         primary_agent = agents[0]
         collaborating_agents = agents[1:]
+        collaborating_names = [agent.name for agent in collaborating_agents]
+        
+        log_buffer = self._log_buffer(execution)
         
         # Phase 1: Primary agent analyzes task and creates plan
         primary_instance = self.agent_instances[primary_agent.id]
         
-        planning_context = {
-            "task_id": task.id,
-            "title": task.title,
-            "description": task.description,
-            "expected_output": task.expected_output,
-            "resources": task.resources,
-            "priority": task.priority.value,
-            "collaborating_agents": [{"name": agent.name, "role": agent.role, "capabilities": agent.capabilities} for agent in collaborating_agents],
-            "phase": "planning"
-        }
-        
-        # Create coordination plan using Claude Code spawning
-        coordination_task = Task(
-            id=f"{task.id}_coordination",
-            title=f"Multi-Agent Coordination Plan: {task.title}",
-            description=f"""Create a detailed coordination plan for executing this task with multiple agents:
+        if collaborating_agents:
+            collaborator_lines = "\n".join(
+                f"- {agent.name} ({agent.role}): {self._agent_display(agent)['caps3']}"
+                for agent in collaborating_agents
+            )
+            
+            # Create coordination plan using Claude Code spawning
+            coordination_task = Task(
+                id=f"{task.id}_coordination",
+                title=f"Multi-Agent Coordination Plan: {task.title}",
+                description=f"""Create a detailed coordination plan for executing this task with multiple agents:
 
 Original Task: {task.description}
 Expected Output: {task.expected_output}
 
 Available Collaborating Agents:
-{chr(10).join([f"- {agent.name} ({agent.role}): {', '.join(agent.capabilities[:3])}" for agent in collaborating_agents])}
+{collaborator_lines}
 
 As the primary coordinator, design an effective strategy that leverages each agent's unique expertise.""",
-            expected_output="Detailed multi-agent coordination strategy with specific agent assignments",
-            priority=task.priority,
-            deadline=task.deadline,
-            resources=task.resources,
-            dependencies=task.dependencies
-        )
-        
-        plan_result = await self._spawn_claude_code_agent(primary_agent, coordination_task, execution, db, work_directory)
-        
-        plan = {
-            "status": "planned",
-            "strategy": plan_result.get('agent_response', 'Multi-agent coordination plan created'),
-            "primary_coordinator": primary_agent.name,
-            "collaborating_agents": [agent.name for agent in collaborating_agents],
-            "execution_method": "claude_code_spawning"
-        }
-        
-        execution.logs.append({
-            "timestamp": datetime.utcnow().isoformat(),
-            "message": f"Primary agent {primary_agent.name} created execution plan",
-            "level": "info",
-            "agent_id": primary_agent.id
-        })
-        db.commit()
-        
-        # Broadcast planning completion
-        if self.websocket_manager:
-            await self.websocket_manager.broadcast({
-                "type": "planning_completed",
-                "execution_id": execution.id,
-                "plan": plan,
-                "timestamp": datetime.utcnow().isoformat()
-            })
+                expected_output="Detailed multi-agent coordination strategy with specific agent assignments",
+                priority=task.priority,
+                deadline=task.deadline,
+                resources=task.resources,
+                dependencies=task.dependencies
+            )
+            
+            plan_result = await self._spawn_claude_code_agent(primary_agent, coordination_task, execution, db, work_directory)
+            
+            plan = {
+                "status": "planned",
+                "strategy": plan_result.get('agent_response', 'Multi-agent coordination plan created'),
+                "primary_coordinator": primary_agent.name,
+                "collaborating_agents": collaborating_names,
+                "execution_method": "claude_code_spawning"
+            }
+            
+            log_buffer.add(f"Primary agent {primary_agent.name} created execution plan", agent_id=primary_agent.id)
+            # Commit before broadcasting so clients that re-read the execution see the plan
+            await log_buffer.flush(db, commit=True)
+            
+            # Broadcast planning completion
+            if self._batcher:
+                await self._batcher.enqueue({
+                    "type": "planning_completed",
+                    "execution_id": execution.id,
+                    "plan": plan,
+                    "timestamp": datetime.utcnow()
+                })
+        else:
+            # Nothing to coordinate: skip the planning spawn and go straight to synthesis
+            plan = {
+                "status": "single_agent_path",
+                "primary_coordinator": primary_agent.name,
+                "collaborating_agents": [],
+                "execution_method": "claude_code_spawning"
+            }
         
         # Phase 2: Execute subtasks with collaborating agents
         subtask_results = {}
         
         if collaborating_agents and isinstance(plan, dict) and "subtasks" in plan:
-            # Execute subtasks in parallel
-            subtask_futures = []
+            # Pair each collaborating agent with its subtask; extra subtasks are left unassigned
+            assignments = list(zip(collaborating_agents, plan["subtasks"]))
             
-            for i, subtask in enumerate(plan["subtasks"]):
-                if i < len(collaborating_agents):
-                    agent = collaborating_agents[i]
-                    agent_instance = self.agent_instances[agent.id]
-                    
-                    subtask_context = {
-                        "task_id": task.id,
-                        "subtask": subtask,
-                        "parent_plan": plan,
-                        "phase": "execution"
-                    }
-                    
-                    # Mock subtask execution
-                    async def execute_subtask(agent, subtask):
-                        await asyncio.sleep(0.5)  # Simulate work
-                        return {
-                            "status": "completed",
-                            "subtask": subtask,
-                            "agent": agent.name,
-                            "output": f"Completed: {subtask}",
-                            "capabilities_used": agent.capabilities[:2]
-                        }
-                    
-                    future = execute_subtask(agent, subtask)
-                    subtask_futures.append((agent, future))
+            # Run all subtasks concurrently; failures come back as exception objects
+            results = await asyncio.gather(
+                *(
+                    self._execute_subtask(agent, subtask, execution, db, work_directory)
+                    for agent, subtask in assignments
+                ),
+                return_exceptions=True
+            )
             
-            # Wait for all subtasks to complete
-            for agent, future in subtask_futures:
-                try:
-                    result = await future
+            for (agent, _), result in zip(assignments, results):
+                if isinstance(result, Exception):
+                    subtask_results[agent.name] = {"error": str(result)}
+                    log_buffer.add(f"Agent {agent.name} failed subtask: {str(result)}", level="error", agent_id=agent.id)
+                else:
                     subtask_results[agent.name] = result
-                    
-                    execution.logs.append({
-                        "timestamp": datetime.utcnow().isoformat(),
-                        "message": f"Agent {agent.name} completed subtask",
-                        "level": "info",
-                        "agent_id": agent.id
-                    })
-                    
-                except Exception as e:
-                    subtask_results[agent.name] = {"error": str(e)}
-                    
-                    execution.logs.append({
-                        "timestamp": datetime.utcnow().isoformat(),
-                        "message": f"Agent {agent.name} failed subtask: {str(e)}",
-                        "level": "error",
-                        "agent_id": agent.id
-                    })
+                    log_buffer.add(f"Agent {agent.name} completed subtask", agent_id=agent.id)
             
-            db.commit()
+            await log_buffer.flush(db)
         
         # Phase 3: Primary agent synthesizes results
-        synthesis_context = {
-            "task_id": task.id,
-            "original_task": {
+        synthesis_context = SynthesisContext(
+            task_id=task.id,
+            original_task={
                 "title": task.title,
                 "description": task.description,
                 "expected_output": task.expected_output
             },
-            "plan": plan,
-            "subtask_results": subtask_results,
-            "phase": "synthesis"
-        }
+            plan=plan,
+            subtask_results=subtask_results
+        )
         
         final_result = await primary_instance.execute_task(synthesis_context)
         
-        execution.logs.append({
-            "timestamp": datetime.utcnow().isoformat(),
-            "message": f"Primary agent {primary_agent.name} synthesized final result",
-            "level": "info",
-            "agent_id": primary_agent.id
-        })
-        db.commit()
+        log_buffer.add(f"Primary agent {primary_agent.name} synthesized final result", agent_id=primary_agent.id)
+        await log_buffer.flush(db)
         
         return {
             "primary_agent": primary_agent.name,
-            "collaborating_agents": [agent.name for agent in collaborating_agents],
+            "collaborating_agents": collaborating_names,
             "execution_type": "multi_agent_collaboration",
             "plan": plan,
             "subtask_results": subtask_results,
@@ -1003,52 +1434,100 @@ As the primary coordinator, design an effective strategy that leverages each age
             "completion_time": datetime.utcnow().isoformat()
         }
     
-    async def stop_execution(self, db: Session, execution_id: str):
+    async def stop_execution(self, db: AsyncSession, execution_id: str):
         """Stop a running execution."""
         
-        if execution_id in self.running_executions:
-            # Cancel the asyncio task
-            self.running_executions[execution_id].cancel()
-            del self.running_executions[execution_id]
+        # With a celery backend or a shared state store the run may live in another process
+        if execution_id in self.running_executions or EXECUTION_BACKEND == "celery" or self._state is not None:
+            # Cancel the run and let it unwind before touching its rows
+            await self._cancel_run(execution_id)
             
             # Update database
-            execution = db.query(Execution).filter(Execution.id == execution_id).first()
-            if execution:
+            execution = await db.get(Execution, execution_id)
+            if execution and execution.status in ("starting", "running"):
                 execution.status = "cancelled"
                 execution.end_time = datetime.utcnow()
-                execution.logs.append({
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "message": "Execution cancelled by user",
-                    "level": "warning"
-                })
                 
-                # Update task status
-                task = db.query(Task).filter(Task.id == execution.task_id).first()
-                if task:
-                    task.status = TaskStatus.CANCELLED
+                log_buffer = _LogBuffer(execution)
+                log_buffer.add("Execution cancelled by user", level="warning")
                 
-                # Reset agent statuses
-                agent = db.query(Agent).filter(Agent.id == execution.agent_id).first()
-                if agent:
-                    agent.status = AgentStatus.IDLE
+                # Update task and agent rows directly; no need to load them first
+                await db.execute(
+                    update(Task)
+                    .where(Task.id == execution.task_id)
+                    .values(status=TaskStatus.CANCELLED)
+                )
+                await db.execute(
+                    update(Agent)
+                    .where(Agent.id == execution.agent_id)
+                    .values(status=AgentStatus.IDLE)
+                )
                 
-                db.commit()
+                await log_buffer.flush(db, commit=True)
+    
+    async def listen_for_state_changes(self):
+        """Track status counts and notify clients from Postgres NOTIFY instead of polling.
+        
+        Run as a background task for the lifetime of the API process. While it
+        runs, get_system_status answers from an in-memory tally. Does nothing on
+        databases without LISTEN/NOTIFY.
+        """
+        if async_engine.dialect.name != "postgresql":
+            return
+        
+        async with async_engine.connect() as conn:
+            listener = (await conn.get_raw_connection()).driver_connection
+            await listener.add_listener(STATE_CHANGE_CHANNEL, self._on_state_change)
+            try:
+                # Seed after subscribing so no change between the two goes unseen
+                counts = Counter()
+                for table, column in (("agents", Agent.status), ("tasks", Task.status)):
+                    for status, rows in await conn.execute(select(column, func.count()).group_by(column)):
+                        counts[(table, status.name)] = rows
+                self._status_counts = counts
+                await asyncio.Future()  # Notifications arrive on the callback until cancelled
+            finally:
+                self._status_counts = None
+                await listener.remove_listener(STATE_CHANGE_CHANNEL, self._on_state_change)
+    
+    async def _on_state_change(self, connection: Any, pid: int, channel: str, payload: str):
+        change = orjson.loads(payload)
+        
+        counts = self._status_counts
+        if counts is not None and change["table"] in ("agents", "tasks"):
+            if change["old_status"] is not None:
+                counts[(change["table"], change["old_status"])] -= 1
+            if change["status"] is not None:
+                counts[(change["table"], change["status"])] += 1
+        
+        if self._batcher:
+            await self._batcher.enqueue({"type": "state_change", **change, "timestamp": datetime.utcnow()})
     
-    async def get_system_status(self, db: Session) -> SystemStatus:
+    async def get_system_status(self, db: AsyncSession) -> SystemStatus:
         """Get overall system status and metrics."""
         
-        # Count agents by status
-        total_agents = db.query(Agent).count()
-        active_agents = db.query(Agent).filter(Agent.status == AgentStatus.EXECUTING).count()
-        
-        # Count tasks by status
-        total_tasks = db.query(Task).count()
-        pending_tasks = db.query(Task).filter(Task.status == TaskStatus.PENDING).count()
-        running_tasks = db.query(Task).filter(Task.status == TaskStatus.IN_PROGRESS).count()
-        completed_tasks = db.query(Task).filter(Task.status == TaskStatus.COMPLETED).count()
-        failed_tasks = db.query(Task).filter(Task.status == TaskStatus.FAILED).count()
+        counts = self._status_counts
+        if counts is not None:
+            # Kept current by listen_for_state_changes; no query needed
+            total_agents = sum(rows for (table, _), rows in counts.items() if table == "agents")
+            active_agents = counts[("agents", AgentStatus.EXECUTING.name)]
+            total_tasks = sum(rows for (table, _), rows in counts.items() if table == "tasks")
+            pending_tasks, running_tasks, completed_tasks, failed_tasks = (
+                counts[("tasks", status.name)] for status in (
+                    TaskStatus.PENDING, TaskStatus.IN_PROGRESS, TaskStatus.COMPLETED, TaskStatus.FAILED
+                )
+            )
+        else:
+            cached = self._system_status_cache
+            if cached and time.monotonic() - cached[0] < SYSTEM_STATUS_TTL_SECONDS:
+                return cached[1]
+            
+            total_agents, active_agents = (await db.execute(AGENT_COUNTS_QUERY)).one()
+            total_tasks, pending_tasks, running_tasks, completed_tasks, failed_tasks = (
+                await db.execute(TASK_COUNTS_QUERY)
+            ).one()
         
-        return SystemStatus(
+        status = SystemStatus(
             total_agents=total_agents,
             active_agents=active_agents,
             total_tasks=total_tasks,
@@ -1060,13 +1539,55 @@ As the primary coordinator, design an effective strategy that leverages each age
             memory_usage={"used": "256MB", "total": "1GB"},  # TODO: Get actual memory usage
             last_updated=datetime.utcnow()
         )
+        self._system_status_cache = (time.monotonic(), status)
+        return status
+    
+    async def get_all_executions(
+        self, db: AsyncSession, after: Optional[Tuple[datetime, str]] = None, limit: int = 50
+    ) -> Tuple[List[ExecutionResponse], Optional[Tuple[datetime, str]]]:
+        """Get a page of execution summaries, newest first, and the cursor for the next page.
+        
+        Pages are keyed on (start_time, id) rather than an offset, so each one is a
+        seek on ix_executions_start_time_id. Pass the returned cursor as `after` to
+        continue; it is None on the last page. Only the summary columns are selected;
+        logs and outputs come from get_execution.
+        """
+        query = EXECUTION_SUMMARY_QUERY
+        if after is not None:
+            query = query.where(tuple_(Execution.start_time, Execution.id) < tuple_(*after))
+        
+        rows = (await db.execute(query.limit(limit))).mappings().all()
+        executions = [ExecutionResponse.model_construct(**row) for row in rows]
+        next_cursor = (rows[-1]["start_time"], rows[-1]["id"]) if len(rows) == limit else None
+        return executions, next_cursor
     
-    async def get_all_executions(self, db: Session) -> List[ExecutionResponse]:
-        """Get all executions."""
-        executions = db.query(Execution).all()
-        return [ExecutionResponse.from_orm(execution) for execution in executions]
+    async def iter_executions(self, db: AsyncSession, batch_size: int = 100) -> AsyncIterator[ExecutionResponse]:
+        """Stream every execution summary, newest first, without holding them all in memory."""
+        rows = await db.stream(EXECUTION_SUMMARY_QUERY.execution_options(yield_per=batch_size))
+        async for row in rows.mappings():
+            yield ExecutionResponse.model_construct(**row)
     
-    async def get_execution(self, db: Session, execution_id: str) -> Optional[ExecutionResponse]:
+    async def get_execution(self, db: AsyncSession, execution_id: str) -> Optional[ExecutionResponse]:
         """Get specific execution by ID."""
-        execution = db.query(Execution).filter(Execution.id == execution_id).first()
-        return ExecutionResponse.from_orm(execution) if execution else None
\ No newline at end of file
+        execution = await db.get(Execution, execution_id)
+        if not execution:
+            return None
+        logs_by_execution = await self._load_logs(db, [execution_id])
+        return self._execution_response(execution, logs_by_execution.get(execution_id, []))
+    
+    async def _load_logs(self, db: AsyncSession, execution_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Fetch execution_logs rows for the given executions, grouped and in write order."""
+        logs_by_execution: Dict[str, List[Dict[str, Any]]] = {}
+        if not execution_ids:
+            return logs_by_execution
+        rows = await db.scalars(LOGS_BY_EXECUTION_IDS_QUERY, {"execution_ids": execution_ids})
+        for row in rows:
+            logs_by_execution.setdefault(row.execution_id, []).append(row.to_dict())
+        return logs_by_execution
+    
+    def _execution_response(self, execution: Execution, log_rows: List[Dict[str, Any]]) -> ExecutionResponse:
+        """Build the API response, appending execution_logs rows after any legacy JSON logs."""
+        response = ExecutionResponse.model_validate(execution)
+        if log_rows:
+            response.logs = (execution.logs or []) + log_rows
+        return response
\ No newline at end of file
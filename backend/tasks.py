@@ -0,0 +1,62 @@
+"""
+Celery worker tasks for running executions outside the API process.
+
+Start a worker from the backend directory with:
+    celery -A tasks worker --loglevel=info
+
+The API only enqueues when EXECUTION_BACKEND=celery; otherwise executions
+run inside the API process.
+"""
+
+import asyncio
+import os
+from typing import List, Optional
+
+from celery import Celery
+from sqlalchemy.exc import OperationalError
+
+from database import async_engine
+from services import broadcast_channel
+from services.execution_engine import ExecutionEngine, claude_pool
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+celery_app = Celery("multi_agent", broker=REDIS_URL, backend=REDIS_URL)
+celery_app.conf.update(
+    task_acks_late=True,  # Re-deliver the job if a worker dies mid-run
+    worker_prefetch_multiplier=1  # Agent runs are long; don't hoard queued jobs
+)
+
+# One engine per worker process. It has no WebSocket clients; with BROADCAST_REDIS_URL set
+# its events are published for the API workers to relay, otherwise it only writes to the database
+worker_engine = ExecutionEngine()
+
+
+async def _run(execution_id: str, task_id: str, agent_ids: List[str], work_directory: Optional[str]):
+    # Each task runs in a fresh event loop, so the Redis client is created per run
+    redis = broadcast_channel.redis_client()
+    broadcaster = broadcast_channel.RedisBroadcaster(redis) if redis is not None else None
+    worker_engine.set_websocket_manager(broadcaster)
+    # With STATE_REDIS_URL set, the API can stop this run by publishing on its control channel
+    await worker_engine.start_control_listener()
+    try:
+        await worker_engine.run_execution(execution_id, task_id, agent_ids, work_directory)
+    finally:
+        await worker_engine.stop_control_listener()
+        worker_engine.set_websocket_manager(None)
+        if broadcaster is not None:
+            await broadcaster.close()
+        # Pooled connections and CLI processes can't be reused across event loops either
+        await claude_pool.close()
+        await async_engine.dispose()
+
+
+@celery_app.task(bind=True, max_retries=3)
+def run_agent_task(self, execution_id: str, task_id: str, agent_ids: List[str], work_directory: Optional[str] = None):
+    """Run one started execution end to end and record the outcome."""
+    try:
+        asyncio.run(_run(execution_id, task_id, agent_ids, work_directory))
+    except OperationalError as exc:
+        # Database unreachable. The run checks the execution's status first and
+        # skips finished ones, so a retry never repeats a completed execution
+        raise self.retry(exc=exc, countdown=5)
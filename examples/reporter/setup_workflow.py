@@ -8,10 +8,19 @@ import json
 import requests
 import sys
 import os
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # API Configuration
 API_BASE = "http://localhost:8000"
 
+# One keep-alive connection pool for every API call. Retries cover failed connects;
+# POSTs aren't retried once sent, so a slow response can't create duplicates
+session = requests.Session()
+adapter = HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=Retry(total=3, backoff_factor=0.2))
+session.mount("http://", adapter)
+session.mount("https://", adapter)
+
 def load_json_file(filepath):
     """Load and return JSON data from file."""
     try:
@@ -37,7 +46,7 @@ def create_agent(agent_data):
             "status": "idle"
         }
         
-        response = requests.post(f"{API_BASE}/api/agents", json=api_data)
+        response = session.post(f"{API_BASE}/api/agents", json=api_data)
         if response.status_code in [200, 201]:
             result = response.json()
             agent_id = result["id"]
@@ -65,7 +74,7 @@ def create_task(task_data):
             "status": "pending"
         }
         
-        response = requests.post(f"{API_BASE}/api/tasks", json=api_data)
+        response = session.post(f"{API_BASE}/api/tasks", json=api_data)
         if response.status_code in [200, 201]:
             result = response.json()
             task_id = result["id"]
@@ -10,6 +10,7 @@ import subprocess
 import time
 import signal
 import platform
+import importlib.util
 from pathlib import Path
 from threading import Thread
 import webbrowser
@@ -151,6 +152,13 @@ def start_backend():
     cmd = [sys.executable, '-m', 'uvicorn', 'main:app', 
            '--reload', '--host', '0.0.0.0', '--port', '8000']
     
+    # uvloop and httptools (from uvicorn[standard]) replace the pure-Python event loop
+    # and HTTP parser; uvloop is unavailable on Windows, so only ask for what is installed
+    if importlib.util.find_spec('uvloop'):
+        cmd += ['--loop', 'uvloop']
+    if importlib.util.find_spec('httptools'):
+        cmd += ['--http', 'httptools']
+    
     process = subprocess.Popen(cmd, cwd='backend')
     
     # Wait for startup
@@ -0,0 +1,77 @@
+"""
+Shared fixtures. The backend runs against a throwaway SQLite database, and
+Claude CLI runs are replaced by a stand-in that blocks until cancelled.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# The backend imports its modules top-level and reads DATABASE_URL on import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+
+import pytest
+
+from database import AsyncSessionLocal, async_engine, engine, init_db
+from models import Agent, Base, Task
+
+
+@pytest.fixture
+async def db():
+    """Async session on freshly created tables."""
+    Base.metadata.drop_all(bind=engine)
+    init_db()
+    async with AsyncSessionLocal() as session:
+        yield session
+    # Pooled aiosqlite connections belong to this test's event loop
+    await async_engine.dispose()
+
+
+@pytest.fixture
+def parked_runs():
+    """Ids of executions whose agent runs have reached the blocking stand-in."""
+    return set()
+
+
+@pytest.fixture
+async def execution_engine(db, parked_runs, tmp_path, monkeypatch):
+    """ExecutionEngine whose agent runs block until cancelled; its runs are stopped before db closes."""
+    # The engine creates claude_executions in the working directory, including the
+    # module's global instance on first import
+    monkeypatch.chdir(tmp_path)
+    from services.execution_engine import ExecutionEngine
+    
+    async def run_agent(self, db, execution, task, agent, work_dir, timeout=60):
+        parked_runs.add(execution.id)
+        await asyncio.Event().wait()
+    
+    monkeypatch.setattr(ExecutionEngine, "_execute_with_claude_sdk_timeout", run_agent)
+    engine = ExecutionEngine()
+    yield engine
+    
+    # Cancel runs once they are parked in run_agent: a run cancelled midway through a
+    # database call can leave its SQLite connection holding a lock into the next test
+    for _ in range(100):
+        if all(run.done() or execution_id in parked_runs for execution_id, run in engine.running_executions.items()):
+            break
+        await asyncio.sleep(0.01)
+    runs = list(engine.running_executions.values())
+    for run in runs:
+        run.cancel()
+    await asyncio.gather(*runs, return_exceptions=True)
+
+
+@pytest.fixture
+def make_task(db):
+    """Create a task assigned to new agents with the given names."""
+    async def make(title: str, *agent_names: str):
+        agents = [Agent(name=name, role="developer", system_prompt="You are a test agent.") for name in agent_names]
+        task = Task(title=title, description="Test task", assigned_agents=agents)
+        db.add_all(agents + [task])
+        await db.commit()
+        return task, agents
+    return make
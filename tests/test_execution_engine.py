@@ -0,0 +1,197 @@
+"""Agent claims across the execution lifecycle."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from database import AsyncSessionLocal
+from models import Agent, AgentStatus, Execution, ExecutionAgent, ExecutionLog
+from schemas import TaskExecutionRequest
+
+
+async def agent_statuses(agent_ids):
+    """Statuses by agent name as committed, read outside the test's session."""
+    async with AsyncSessionLocal() as session:
+        rows = await session.execute(select(Agent.name, Agent.status).where(Agent.id.in_(agent_ids)))
+        return dict(rows.all())
+
+
+async def execution_status(execution_id):
+    async with AsyncSessionLocal() as session:
+        return await session.scalar(select(Execution.status).where(Execution.id == execution_id))
+
+
+async def wait_until_parked(parked_runs, execution_id):
+    """Let a run get past its database work; a run cancelled midway can leave SQLite locked."""
+    while execution_id not in parked_runs:
+        await asyncio.sleep(0.01)
+
+
+async def start(engine, db, task, agent_ids, tmp_path):
+    request = TaskExecutionRequest(task_id=task.id, agent_ids=agent_ids, work_directory=str(tmp_path))
+    return await engine.start_task_execution(db, request)
+
+
+async def test_resume_reclaims_participants(execution_engine, db, make_task, tmp_path):
+    task, agents = await make_task("Resume", "Lead", "Helper")
+    agent_ids = [agent.id for agent in agents]
+    started = await start(execution_engine, db, task, agent_ids, tmp_path)
+
+    assert await execution_engine.pause_execution(started.execution_id, db)
+    assert set((await agent_statuses(agent_ids)).values()) == {AgentStatus.IDLE}
+
+    assert await execution_engine.resume_execution(started.execution_id, db)
+    assert await agent_statuses(agent_ids) == {"Lead": AgentStatus.EXECUTING, "Helper": AgentStatus.EXECUTING}
+    assert started.execution_id in execution_engine.running_executions
+
+
+async def test_resume_refuses_when_a_participant_is_busy(execution_engine, db, make_task, tmp_path):
+    task, (lead, helper) = await make_task("Resume", "Lead", "Helper")
+    agent_ids = [lead.id, helper.id]
+    started = await start(execution_engine, db, task, agent_ids, tmp_path)
+    assert await execution_engine.pause_execution(started.execution_id, db)
+
+    # Another execution takes the helper while the first one is paused
+    other_task, _ = await make_task("Other")
+    await start(execution_engine, db, other_task, [helper.id], tmp_path)
+
+    with pytest.raises(ValueError, match="Agents are busy"):
+        await execution_engine.resume_execution(started.execution_id, db)
+
+    # Nothing was claimed and the execution can still be resumed later
+    assert await agent_statuses(agent_ids) == {"Lead": AgentStatus.IDLE, "Helper": AgentStatus.EXECUTING}
+    assert await execution_status(started.execution_id) == "paused"
+    assert started.execution_id in execution_engine.paused_executions
+    assert started.execution_id not in execution_engine.running_executions
+
+
+async def test_abort_releases_every_participant(execution_engine, db, make_task, tmp_path):
+    task, agents = await make_task("Abort", "Lead", "Helper")
+    agent_ids = [agent.id for agent in agents]
+    started = await start(execution_engine, db, task, agent_ids, tmp_path)
+
+    assert await execution_engine.abort_execution(started.execution_id, db)
+
+    assert await agent_statuses(agent_ids) == {"Lead": AgentStatus.IDLE, "Helper": AgentStatus.IDLE}
+    assert await execution_status(started.execution_id) == "cancelled"
+
+
+async def test_abort_of_paused_execution_releases_every_participant(execution_engine, db, make_task, tmp_path):
+    task, agents = await make_task("Abort", "Lead", "Helper")
+    agent_ids = [agent.id for agent in agents]
+    started = await start(execution_engine, db, task, agent_ids, tmp_path)
+    assert await execution_engine.pause_execution(started.execution_id, db)
+    assert await execution_engine.resume_execution(started.execution_id, db)
+
+    assert await execution_engine.abort_execution(started.execution_id, db)
+
+    assert await agent_statuses(agent_ids) == {"Lead": AgentStatus.IDLE, "Helper": AgentStatus.IDLE}
+    assert not execution_engine.paused_executions
+
+
+async def test_failed_commit_keeps_buffered_logs(execution_engine, db, make_task, tmp_path):
+    task, (lead,) = await make_task("Logs", "Lead")
+    started = await start(execution_engine, db, task, [lead.id], tmp_path)
+    execution = await db.get(Execution, started.execution_id)
+    execution_engine._buffer_log(execution, "Survives a failed commit")
+
+    async def fail():
+        raise RuntimeError("database unavailable")
+
+    db.commit = fail
+    with pytest.raises(RuntimeError):
+        await execution_engine._commit(db, execution)
+    del db.commit
+    await db.rollback()
+
+    # The next commit writes the entries the failed one could not
+    execution = await db.get(Execution, started.execution_id)
+    await execution_engine._commit(db, execution)
+    messages = (await db.scalars(
+        select(ExecutionLog.message).where(ExecutionLog.execution_id == started.execution_id)
+    )).all()
+    assert messages.count("Survives a failed commit") == 1
+
+
+async def test_start_records_every_participant(execution_engine, db, make_task, tmp_path):
+    task, agents = await make_task("Participants", "Lead", "Helper", "Reviewer")
+    agent_ids = [agent.id for agent in agents]
+    started = await start(execution_engine, db, task, agent_ids, tmp_path)
+
+    rows = await db.execute(
+        select(ExecutionAgent.agent_id, ExecutionAgent.role).where(ExecutionAgent.execution_id == started.execution_id)
+    )
+    # The first requested agent is the primary one, the rest collaborate
+    assert dict(rows.all()) == {agent_ids[0]: "primary", agent_ids[1]: "collaborator", agent_ids[2]: "collaborator"}
+    execution = await db.get(Execution, started.execution_id)
+    assert execution.agent_id == agent_ids[0]
+
+
+async def test_start_claims_every_participant(execution_engine, db, make_task, tmp_path):
+    task, agents = await make_task("Start", "Lead", "Helper")
+    agent_ids = [agent.id for agent in agents]
+    await start(execution_engine, db, task, agent_ids, tmp_path)
+
+    assert await agent_statuses(agent_ids) == {"Lead": AgentStatus.EXECUTING, "Helper": AgentStatus.EXECUTING}
+
+    # A second start with any of them is refused and claims nothing
+    other_task, (spare,) = await make_task("Other", "Spare")
+    with pytest.raises(ValueError, match="Agents are busy"):
+        await start(execution_engine, db, other_task, [spare.id, agent_ids[1]], tmp_path)
+    assert await agent_statuses([spare.id]) == {"Spare": AgentStatus.IDLE}
+
+
+async def test_system_status_is_recounted_after_invalidation(execution_engine, db, make_task):
+    await make_task("Counted", "Lead")
+    assert (await execution_engine.get_system_status(db)).total_agents == 1
+
+    await make_task("Uncounted", "Helper")
+    # Within the TTL the cached counts are served
+    assert (await execution_engine.get_system_status(db)).total_agents == 1
+
+    execution_engine.invalidate_system_status()
+    assert (await execution_engine.get_system_status(db)).total_agents == 2
+
+
+async def test_transition_commit_invalidates_system_status(execution_engine, db, make_task, parked_runs, tmp_path):
+    task, (lead,) = await make_task("Transition", "Lead")
+    assert (await execution_engine.get_system_status(db)).active_agents == 0
+
+    started = await start(execution_engine, db, task, [lead.id], tmp_path)
+    assert (await execution_engine.get_system_status(db)).active_agents == 1
+
+    await wait_until_parked(parked_runs, started.execution_id)
+    await execution_engine.abort_execution(started.execution_id, db)
+    assert (await execution_engine.get_system_status(db)).active_agents == 0
+
+
+def test_slots_are_created_per_event_loop(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from services import execution_engine as ee
+
+    async def slots():
+        assert ee._execution_slots() is ee._execution_slots()
+        return ee._execution_slots(), ee._agent_slots()
+
+    first, second = asyncio.run(slots()), asyncio.run(slots())
+    # Each loop gets its own semaphores, so none is used on a loop it wasn't built for
+    assert first[0] is not second[0] and first[1] is not second[1]
+    assert first[0]._value == ee.MAX_CONCURRENT_EXECUTIONS
+
+
+async def test_concurrent_controls_are_serialised(execution_engine, db, make_task, parked_runs, tmp_path):
+    task, (lead,) = await make_task("Controls", "Lead")
+    started = await start(execution_engine, db, task, [lead.id], tmp_path)
+    await wait_until_parked(parked_runs, started.execution_id)
+
+    # Both go through the control lock; the abort waits for the pause and then finds it paused
+    async with AsyncSessionLocal() as other_db:
+        paused, aborted = await asyncio.gather(
+            execution_engine.pause_execution(started.execution_id, db),
+            execution_engine.abort_execution(started.execution_id, other_db)
+        )
+
+    assert paused and aborted
+    assert await execution_status(started.execution_id) == "cancelled"
+    assert not execution_engine.paused_executions
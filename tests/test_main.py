@@ -0,0 +1,81 @@
+"""API endpoints, called directly with a session."""
+
+from typing import List
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.orm import selectinload
+
+from database import AsyncSessionLocal
+from models import Task, TaskStatus
+from schemas import AgentCreate, AgentListItem, TaskCreate, TaskListItem, TaskUpdate
+
+
+@pytest.fixture
+def main(tmp_path, monkeypatch):
+    pytest.importorskip("mcp_agent")
+    monkeypatch.chdir(tmp_path)  # The engine creates claude_executions in the working directory on import
+    import main
+    return main
+
+
+async def test_agent_and_task_changes_invalidate_system_status(main, db):
+    engine = main.execution_engine
+    before = await engine.get_system_status(db)
+
+    agent = await main.create_agent(agent=AgentCreate(name="Counted", role="developer", system_prompt="You are a test agent."), db=db)
+    await main.create_task(task=TaskCreate(title="Counted", description="Test task", assigned_agent_ids=[agent.id]), db=db)
+
+    after = await engine.get_system_status(db)
+    assert after.total_agents == before.total_agents + 1
+    assert after.total_tasks == before.total_tasks + 1
+    assert after.pending_tasks == before.pending_tasks + 1
+
+
+async def test_create_task_commits_once_with_its_assignments(main, db):
+    agents = [
+        await main.agent_manager.create_agent(db, AgentCreate(name=name, role="developer", system_prompt="You are a test agent."))
+        for name in ("Lead", "Helper")
+    ]
+
+    commits = []
+
+    def count_commit(session):
+        commits.append(session)
+
+    event.listen(db.sync_session, "after_commit", count_commit)
+    try:
+        created = await main.task_scheduler.create_task(
+            db, TaskCreate(title="Assigned", description="Test task", assigned_agent_ids=[agent.id for agent in agents])
+        )
+    finally:
+        event.remove(db.sync_session, "after_commit", count_commit)
+
+    assert len(commits) == 1
+    assert sorted(agent.name for agent in created.assigned_agents) == ["Helper", "Lead"]
+    async with AsyncSessionLocal() as session:
+        task = await session.scalar(select(Task).where(Task.id == created.id).options(selectinload(Task.assigned_agents)))
+        assert sorted(agent.name for agent in task.assigned_agents) == ["Helper", "Lead"]
+
+
+async def test_task_summaries_apply_the_status_filter(main, db):
+    pending = await main.task_scheduler.create_task(db, TaskCreate(title="Pending", description="Test task"))
+    done = await main.task_scheduler.create_task(db, TaskCreate(title="Done", description="Test task"))
+    await main.task_scheduler.update_task(db, done.id, TaskUpdate(status=TaskStatus.COMPLETED))
+
+    completed = await main.task_scheduler.list_task_items(db, status=TaskStatus.COMPLETED)
+    assert [item.id for item in completed] == [done.id]
+    assert {task.id for task in await main.task_scheduler.list_tasks(db, status=TaskStatus.PENDING)} == {pending.id}
+
+
+def test_summary_routes_are_not_taken_for_ids(main):
+    from starlette.routing import Match
+
+    for path, endpoint, response_model in (
+        ("/api/agents/summary", main.list_agent_summaries, List[AgentListItem]),
+        ("/api/tasks/summary", main.list_task_summaries, List[TaskListItem])
+    ):
+        scope = {"type": "http", "method": "GET", "path": path}
+        route = next(route for route in main.app.routes if route.matches(scope)[0] == Match.FULL)
+        assert route.endpoint is endpoint
+        assert route.response_model == response_model
@@ -0,0 +1,37 @@
+"""Model helpers."""
+
+import uuid
+
+import models
+from models import uuid7
+
+
+def test_uuid7_layout():
+    value = uuid7()
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+
+
+def test_uuid7_sorts_by_creation_time(monkeypatch):
+    clock = iter(range(1_700_000_000_000_000_000, 1_700_000_001_000_000_000, 1_000_000))
+    monkeypatch.setattr(models.time, "time_ns", lambda: next(clock))
+
+    ids = [uuid7() for _ in range(200)]
+
+    # A later millisecond always sorts later, both as UUIDs and as the stored strings
+    assert ids == sorted(ids)
+    assert [str(value) for value in ids] == sorted(str(value) for value in ids)
+    assert len(set(ids)) == len(ids)
+
+
+def test_uuid7_leads_with_unix_milliseconds(monkeypatch):
+    monkeypatch.setattr(models.time, "time_ns", lambda: 1_700_000_000_123_456_789)
+    assert uuid7().int >> 80 == 1_700_000_000_123
+
+
+def test_top_capabilities_follows_capabilities():
+    agent = models.Agent(name="Lead", role="developer", capabilities=["plan", "code", "test", "review"])
+    assert agent.top_capabilities == ("plan", "code", "test")
+
+    agent.capabilities = ["deploy"]
+    assert agent.top_capabilities == ("deploy",)